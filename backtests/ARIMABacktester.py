@@ -1,22 +1,240 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from statsmodels.tsa.arima.model import ARIMA
 from statsmodels.tsa.stattools import adfuller
 from sklearn.metrics import mean_squared_error, mean_absolute_error
 import matplotlib.pyplot as plt
 import warnings
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import contextlib
+import io
+import multiprocessing
+import time
 import sys
 import os
 
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from data.Index import fetch_nifty5_list
+from utils.helper import download_data
 
 warnings.filterwarnings('ignore')
 
+ARIMA_ENGINES = ('refit', 'state_space')
+
+
+def fit_arima(window, order, start_params=None, counters=None):
+    """
+    Fit an ARIMA on one window, seeding the optimizer with `start_params` when given.
+    Falls back to a cold start if the warm-started fit fails or does not converge.
+    Optimizer iterations, wall time and fallbacks are accumulated into `counters`.
+    """
+    counters = counters if counters is not None else {}
+    started = time.perf_counter()
+    model = ARIMA(window, order=order)
+    fitted_model = None
+    try:
+        if start_params is not None:
+            try:
+                fitted_model = model.fit(start_params=start_params)
+                counters['iterations'] = counters.get('iterations', 0) + fitted_model.mle_retvals.get('iterations', 0)
+                if not fitted_model.mle_retvals.get('converged', True):
+                    fitted_model = None
+            except Exception:
+                fitted_model = None
+            if fitted_model is None:
+                counters['cold_fallbacks'] = counters.get('cold_fallbacks', 0) + 1
+
+        if fitted_model is None:
+            fitted_model = model.fit()
+            counters['iterations'] = counters.get('iterations', 0) + fitted_model.mle_retvals.get('iterations', 0)
+    finally:
+        counters['fits'] = counters.get('fits', 0) + 1
+        counters['fit_time'] = counters.get('fit_time', 0.0) + time.perf_counter() - started
+    return fitted_model
+
+
+def rolling_arima_forecasts(prices, start_idx, end_idx=None, train_window=100, order=(2, 1, 2),
+                            engine='refit', refit_every=None, drift_check_every=20, progress_every=50,
+                            warm_start=False):
+    """
+    One-step-ahead rolling ARIMA forecasts for positions start_idx..end_idx-1 of `prices`.
+
+    engine='refit' fits a fresh ARIMA on every window (the reference behaviour).
+    engine='state_space' fits once on the first window (and again every `refit_every`
+    steps) and in between only advances the Kalman filter with each new observation.
+    In that mode a full-refit baseline forecast is also computed every
+    `drift_check_every` steps (and at every refit) to measure how far the two drift apart.
+
+    With warm_start=True each fit starts from the previous window's converged
+    parameters instead of the default starting values (opt-in, since it changes
+    the reference refit output). Drift baselines are always fitted cold.
+
+    Returns (forecasts, stats): forecasts maps position -> forecast, stats holds
+    fit counts, optimizer iterations, fit wall time and the drift summary.
+    """
+    if engine not in ARIMA_ENGINES:
+        raise ValueError(f"Unknown ARIMA engine '{engine}', expected one of {ARIMA_ENGINES}")
+
+    prices = np.asarray(prices, dtype=float)
+    end_idx = len(prices) if end_idx is None else end_idx
+    forecasts = {}
+    drift = []
+    counters = {'fits': 0, 'iterations': 0, 'fit_time': 0.0, 'cold_fallbacks': 0}
+    fitted_model = None
+    last_params = None
+    steps_since_fit = 0
+
+    for i in range(start_idx, end_idx):
+        if progress_every and i % progress_every == 0:
+            print(f"Processing observation {i}/{len(prices)}")
+
+        window = prices[i - train_window:i]
+        try:
+            if engine == 'refit':
+                fitted_model = fit_arima(window, order, last_params if warm_start else None, counters)
+                last_params = fitted_model.params
+                forecasts[i] = fitted_model.forecast(steps=1)[0]
+                continue
+
+            incremental = None
+            if fitted_model is not None:
+                try:
+                    # Feed the newest observation through the filter using the existing parameters
+                    fitted_model = fitted_model.extend(prices[i - 1:i])
+                    incremental = fitted_model.forecast(steps=1)[0]
+                    steps_since_fit += 1
+                except Exception as e:
+                    print(f"State update failed at index {i}, refitting: {e}")
+                    fitted_model = None
+
+            refit_due = fitted_model is None or (refit_every and steps_since_fit >= refit_every)
+            check_due = drift_check_every and (i - start_idx) % drift_check_every == 0
+            baseline_model = None
+            if check_due and incremental is not None:
+                # The drift baseline is a true full refit, so it never reuses previous parameters
+                baseline_model = fit_arima(window, order, None, counters)
+                last_params = baseline_model.params
+                baseline = baseline_model.forecast(steps=1)[0]
+                drift.append((abs(incremental - baseline), abs(incremental - baseline) / abs(prices[i - 1])))
+            if refit_due:
+                if baseline_model is None:
+                    baseline_model = fit_arima(window, order, last_params if warm_start else None, counters)
+                    last_params = baseline_model.params
+                fitted_model = baseline_model
+                steps_since_fit = 0
+                incremental = baseline_model.forecast(steps=1)[0]
+
+            forecasts[i] = incremental
+
+        except Exception as e:
+            print(f"Skipping index {i} due to error: {e}")
+            fitted_model = None
+            continue
+
+    stats = {'engine': engine, 'forecasts': len(forecasts), 'warm_start': warm_start, **counters}
+    if engine == 'state_space':
+        drift = np.array(drift) if drift else np.empty((0, 2))
+        stats.update({
+            'refit_every': refit_every,
+            'drift_checks': len(drift),
+            'drift_mae': drift[:, 0].mean() if len(drift) else np.nan,
+            'drift_max': drift[:, 0].max() if len(drift) else np.nan,
+            'drift_mape': drift[:, 1].mean() * 100 if len(drift) else np.nan,
+        })
+    return forecasts, stats
+
+
+BLAS_THREAD_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                    'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+
+def _pin_worker_threads(threads_per_worker):
+    """Pool initializer: cap BLAS/OpenMP threads so workers do not oversubscribe the cores."""
+    for var in BLAS_THREAD_VARS:
+        os.environ[var] = str(threads_per_worker)
+    if threadpool_limits is not None:
+        threadpool_limits(limits=threads_per_worker)
+
+
+@contextlib.contextmanager
+def pinned_process_pool(workers=None, threads_per_worker=1):
+    """
+    Spawn-context process pool whose workers are limited to `threads_per_worker`
+    BLAS/OpenMP threads each, so statsmodels fits do not oversubscribe the cores.
+    """
+    # Spawned workers read these before numpy is imported, which is when BLAS sizes its thread pool
+    previous_env = {var: os.environ.get(var) for var in BLAS_THREAD_VARS}
+    for var in BLAS_THREAD_VARS:
+        os.environ[var] = str(threads_per_worker)
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_pin_worker_threads,
+                                 initargs=(threads_per_worker,)) as executor:
+            yield executor
+    finally:
+        for var, value in previous_env.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+def sharded_arima_forecasts(prices, start_idx, end_idx=None, workers=None, threads_per_worker=1, **kwargs):
+    """
+    Split the forecast range start_idx..end_idx-1 into contiguous blocks, run
+    rolling_arima_forecasts on each block in a separate process and merge the
+    per-index forecasts back in order. Extra keyword arguments go to rolling_arima_forecasts.
+
+    Only engine='refit' with warm_start=False reproduces the serial output exactly.
+    Warm starts and the state-space engine carry state from one step to the next,
+    and every block starts that state cold, so their output depends on `workers`.
+    """
+    prices = np.asarray(prices, dtype=float)
+    end_idx = len(prices) if end_idx is None else end_idx
+    workers = min(workers or os.cpu_count(), max(end_idx - start_idx, 1))
+    bounds = np.linspace(start_idx, end_idx, workers + 1).astype(int)
+    blocks = [(bounds[k], bounds[k + 1]) for k in range(workers) if bounds[k] < bounds[k + 1]]
+    if len(blocks) > 1 and (kwargs.get('engine', 'refit') != 'refit' or kwargs.get('warm_start')):
+        print(f"Warning: engine={kwargs.get('engine', 'refit')} with warm_start={kwargs.get('warm_start', False)} "
+              f"restarts cold at each of the {len(blocks)} block boundaries, so forecasts differ from a serial run")
+
+    print(f"Sharding {end_idx - start_idx} forecasts over {len(blocks)} worker processes")
+    with pinned_process_pool(len(blocks), threads_per_worker) as executor:
+        futures = [executor.submit(rolling_arima_forecasts, prices, block_start, block_end, **kwargs)
+                   for block_start, block_end in blocks]
+        shard_results = [future.result() for future in futures]
+
+    forecasts = {}
+    for shard_forecasts, _ in shard_results:
+        forecasts.update(shard_forecasts)
+    forecasts = dict(sorted(forecasts.items()))
+    return forecasts, merge_engine_stats([stats for _, stats in shard_results])
+
+
+def merge_engine_stats(shard_stats):
+    """Combine rolling_arima_forecasts stats from several shards into one summary."""
+    stats = dict(shard_stats[0])
+    for key in ('forecasts', 'fits', 'iterations', 'fit_time', 'cold_fallbacks'):
+        stats[key] = sum(s[key] for s in shard_stats)
+    if stats['engine'] == 'state_space':
+        checks = np.array([s['drift_checks'] for s in shard_stats])
+        stats['drift_checks'] = int(checks.sum())
+        for key in ('drift_mae', 'drift_mape'):
+            values = np.array([s[key] for s in shard_stats])
+            stats[key] = np.average(values[checks > 0], weights=checks[checks > 0]) if checks.sum() else np.nan
+        stats['drift_max'] = np.nanmax([s['drift_max'] for s in shard_stats]) if checks.sum() else np.nan
+    return stats
+
+
 class ARIMABacktester:
     """
     ARIMA Backtesting System for Nifty 50 Stocks
@@ -34,24 +252,20 @@ class ARIMABacktester:
         self.arima_model = None
         self.fitted_model = None
         self.predictions = None
+        self.engine_stats = {}
         self.results = {}
         
     def download_data(self):
         """Download 10 years of weekly data for the stock"""
         try:
             print(f"Downloading weekly data for {self.symbol}...")
-            data = yf.download(
+            data = download_data(
                 self.symbol, 
-                start=self.start_date, 
-                end=self.end_date, 
                 interval='1wk',
-                progress=False
+                start=self.start_date, 
+                end=self.end_date
             )
             
-            # Clean column names
-            data.columns = [col[0].replace(r'/.+$', '') if isinstance(col, tuple) else col 
-                           for col in data.columns]
-            
             # Use Close prices for analysis
             data = data[['Close']].copy()
             data.columns = ['price']
@@ -88,14 +302,27 @@ class ARIMABacktester:
         result = adfuller(data)
         return result[1] < 0.05  # p-value < 0.05 indicates stationarity
     
-    def fit_arima_model(self, order=(2, 1, 2), train_window=100):
-        """Fit ARIMA model using rolling window approach"""
+    def fit_arima_model(self, order=(2, 1, 2), train_window=100, engine='refit', refit_every=None, warm_start=False,
+                        forecast_workers=1):
+        """
+        Fit ARIMA model using rolling window approach.
+        engine='refit' re-estimates on every window; engine='state_space' estimates
+        once (or every `refit_every` steps) and advances the Kalman filter in between.
+        warm_start=True seeds each estimation with the previous window's parameters (off by default).
+        forecast_workers > 1 shards the forecast range over that many processes; that
+        matches the serial forecasts only with engine='refit' and warm_start=False, since
+        warm starts and state-space updates restart cold at every shard boundary.
+        """
         try:
-            print(f"Fitting rolling ARIMA{order} model for {self.symbol} with train_window={train_window}...")
+            print(f"Fitting rolling ARIMA{order} model for {self.symbol} with train_window={train_window}, engine={engine}...")
             
             # Use rolling window approach instead of single model fit
             self.train_window = train_window
             self.order = order
+            self.engine = engine
+            self.refit_every = refit_every
+            self.warm_start = warm_start
+            self.forecast_workers = forecast_workers
             
             # We'll fit models dynamically during prediction phase
             print(f"Rolling window ARIMA model configured successfully")
@@ -106,7 +333,11 @@ class ARIMABacktester:
             return None
     
     def make_predictions(self):
-        """Make predictions using rolling window ARIMA approach"""
+        """
+        Make predictions using rolling window ARIMA approach.
+        With forecast_workers > 1 the forecasts depend on the worker count unless
+        engine='refit' and warm_start=False (see sharded_arima_forecasts).
+        """
         if not hasattr(self, 'train_window'):
             print("No ARIMA model configured. Run fit_arima_model() first.")
             return False
@@ -116,42 +347,48 @@ class ARIMABacktester:
             
             # Combine train and test data for rolling window
             full_data = pd.concat([self.train_data, self.test_data])
+            prices = full_data['price'].values
             results = []
             
             # Start predictions from the beginning of test data
             test_start_idx = len(self.train_data)
             
-            for i in range(test_start_idx, len(full_data)):
-                if i % 50 == 0:
-                    print(f"Processing observation {i}/{len(full_data)}")
+            engine_kwargs = {
+                'train_window': self.train_window,
+                'order': self.order,
+                'engine': getattr(self, 'engine', 'refit'),
+                'refit_every': getattr(self, 'refit_every', None),
+                'warm_start': getattr(self, 'warm_start', False)
+            }
+            forecast_workers = getattr(self, 'forecast_workers', 1)
+            if forecast_workers == 1:
+                forecasts, self.engine_stats = rolling_arima_forecasts(prices, test_start_idx, **engine_kwargs)
+            else:
+                forecasts, self.engine_stats = sharded_arima_forecasts(
+                    prices, test_start_idx, workers=forecast_workers, **engine_kwargs
+                )
+            
+            for i, forecast in forecasts.items():
+                actual_price = prices[i]
                 
-                try:
-                    # Use rolling window of data up to current point
-                    train_series = full_data.iloc[i - self.train_window:i]
-                    
-                    # Fit ARIMA model on this window
-                    model = ARIMA(train_series['price'], order=self.order)
-                    fitted_model = model.fit()
-                    
-                    # Make one-step ahead forecast
-                    forecast = fitted_model.forecast(steps=1)[0]
-                    actual_price = full_data.iloc[i]['price']
-                    
-                    # Generate trading signal
-                    current_price = train_series.iloc[-1]['price']
-                    signal = 1 if forecast > current_price else -1
-                    
-                    results.append({
-                        'date': full_data.index[i],
-                        'actual_price': actual_price,
-                        'predicted_price': forecast,
-                        'signal': signal,
-                        'current_price': current_price
-                    })
-                    
-                except Exception as e:
-                    print(f"Skipping index {i} due to error: {e}")
-                    continue
+                # Generate trading signal
+                current_price = prices[i - 1]
+                signal = 1 if forecast > current_price else -1
+                
+                results.append({
+                    'date': full_data.index[i],
+                    'actual_price': actual_price,
+                    'predicted_price': forecast,
+                    'signal': signal,
+                    'current_price': current_price
+                })
+            
+            print(f"Fitted {self.engine_stats['fits']} models: {self.engine_stats['iterations']} optimizer iterations, "
+                  f"{self.engine_stats['fit_time']:.2f}s fit time, {self.engine_stats['cold_fallbacks']} cold-start fallbacks")
+            if self.engine_stats['engine'] == 'state_space':
+                print(f"State-space engine: {self.engine_stats['fits']} fits for {len(forecasts)} forecasts, "
+                      f"drift vs full refit MAE {self.engine_stats['drift_mae']:.4f} "
+                      f"({self.engine_stats['drift_mape']:.3f}%) over {self.engine_stats['drift_checks']} checks")
             
             # Convert to DataFrame
             self.predictions_df = pd.DataFrame(results).set_index('date')
@@ -164,36 +401,37 @@ class ARIMABacktester:
             print(f"Error making predictions for {self.symbol}: {str(e)}")
             return False
     
-    def create_rolling_arima_strategy(self, price_data, train_window=100, order=(2, 1, 2)):
+    def create_rolling_arima_strategy(self, price_data, train_window=100, order=(2, 1, 2),
+                                      engine='refit', refit_every=None, warm_start=False, workers=1):
         """
         Build trading strategy using rolling ARIMA forecasts on price data.
         Returns a DataFrame with predictions and trading signals.
+        With workers > 1 the forecast range is split into contiguous blocks run in parallel.
+        Only engine='refit' with warm_start=False gives the same forecasts as workers=1;
+        warm starts and the state-space engine restart cold at every block boundary.
         """
         results = []
 
         print(f"Training window: {train_window} observations")
         
-        for i in range(train_window, len(price_data)):
-            if i % 100 == 0:
-                print(f"Processing observation {i}/{len(price_data)}")
-            
-            try:
-                train_series = price_data.iloc[i - train_window:i]
-                model = ARIMA(train_series, order=order)
-                fitted_model = model.fit()
-                forecast = fitted_model.forecast(steps=1)[0]
-                actual_price = price_data.iloc[i]
-                signal = 1 if forecast > train_series.iloc[-1] else -1
+        prices = np.asarray(price_data, dtype=float)
+        engine_kwargs = {'train_window': train_window, 'order': order, 'engine': engine,
+                         'refit_every': refit_every, 'warm_start': warm_start, 'progress_every': 100}
+        if workers == 1:
+            forecasts, self.engine_stats = rolling_arima_forecasts(prices, train_window, **engine_kwargs)
+        else:
+            forecasts, self.engine_stats = sharded_arima_forecasts(prices, train_window, workers=workers,
+                                                                   **engine_kwargs)
+        
+        for i, forecast in forecasts.items():
+            signal = 1 if forecast > prices[i - 1] else -1
 
-                results.append({
-                    'date': price_data.index[i],
-                    'actual_price': actual_price,
-                    'predicted_price': forecast,
-                    'signal': signal
-                })
-            except Exception as e:
-                print(f"Skipping index {i} due to error: {e}")
-                continue
+            results.append({
+                'date': price_data.index[i],
+                'actual_price': prices[i],
+                'predicted_price': forecast,
+                'signal': signal
+            })
 
         strategy_df = pd.DataFrame(results).set_index('date')
         return strategy_df
@@ -249,8 +487,15 @@ class ARIMABacktester:
                 'test_period_end': self.predictions_df.index[-1],
                 'test_points': len(self.predictions_df),
                 'train_window': self.train_window,
-                'order': str(self.order)
+                'order': str(self.order),
+                'engine': self.engine_stats.get('engine', 'refit'),
+                'fits': self.engine_stats.get('fits'),
+                'fit_iterations': self.engine_stats.get('iterations'),
+                'fit_time': self.engine_stats.get('fit_time')
             }
+            if self.engine_stats.get('engine') == 'state_space':
+                self.results['drift_mae'] = self.engine_stats['drift_mae']
+                self.results['drift_mape'] = self.engine_stats['drift_mape']
             
             print(f"\nResults for {self.symbol}:")
             print(f"RMSE: {rmse:.2f}")
@@ -311,11 +556,12 @@ class ARIMABacktester:
         plt.tight_layout()
         plt.show()
     
-    def run_backtest(self, train_window=100, order=(2, 1, 2)):
+    def run_backtest(self, train_window=100, order=(2, 1, 2), engine='refit', refit_every=None, warm_start=False,
+                     forecast_workers=1):
         """Run complete backtest pipeline with rolling window ARIMA"""
         print(f"\n{'='*60}")
         print(f"Starting Rolling ARIMA Backtest for {self.symbol}")
-        print(f"Train window: {train_window}, Order: {order}")
+        print(f"Train window: {train_window}, Order: {order}, Engine: {engine}")
         print(f"{'='*60}")
         
         # Step 1: Download data
@@ -327,7 +573,9 @@ class ARIMABacktester:
             return None
         
         # Step 3: Configure rolling ARIMA model
-        if not self.fit_arima_model(order=order, train_window=train_window):
+        if not self.fit_arima_model(order=order, train_window=train_window, engine=engine,
+                                    refit_every=refit_every, warm_start=warm_start,
+                                    forecast_workers=forecast_workers):
             return None
         
         # Step 4: Make predictions using rolling window
@@ -344,8 +592,44 @@ class ARIMABacktester:
         return self.results
 
 
-def run_nifty50_arima_backtest(train_window=100, order=(2, 1, 2)):
-    """Run rolling ARIMA backtest on all Nifty 50 stocks"""
+def _run_symbol_backtest(symbol, backtest_kwargs, verbose=False):
+    """Worker entry point: run one symbol's backtest and return its results dict (or None)."""
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        return ARIMABacktester(symbol).run_backtest(**backtest_kwargs)
+
+
+def run_parallel_backtests(symbols, backtest_kwargs, workers=None, threads_per_worker=1, verbose=False):
+    """
+    Run ARIMABacktester.run_backtest for each symbol on a process pool.
+    BLAS threads are pinned to `threads_per_worker` in every worker, progress is
+    printed as symbols complete, and results are returned in the order of `symbols`.
+    """
+    results_by_symbol = {}
+
+    with pinned_process_pool(workers, threads_per_worker) as executor:
+        futures = {executor.submit(_run_symbol_backtest, symbol, backtest_kwargs, verbose): symbol
+                   for symbol in symbols}
+        for completed, future in enumerate(as_completed(futures), 1):
+            symbol = futures[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"Error in backtest for {symbol}: {str(e)}")
+                results = None
+            results_by_symbol[symbol] = results
+            status = f"return {results['arima_return']:.2f}%" if results else "failed"
+            print(f"Progress: {completed}/{len(symbols)} - {symbol} {status}")
+
+    return [results_by_symbol[symbol] for symbol in symbols]
+
+
+def run_nifty50_arima_backtest(train_window=100, order=(2, 1, 2), engine='refit', refit_every=None, warm_start=False,
+                               workers=1, threads_per_worker=1):
+    """
+    Run rolling ARIMA backtest on all Nifty 50 stocks.
+    With workers > 1 (or None for all cores) symbols are spread over a process pool.
+    """
     print("Rolling ARIMA Backtesting System for Nifty 50 Stocks")
     print(f"Train window: {train_window}, Order: {order}")
     print("=" * 60)
@@ -357,24 +641,28 @@ def run_nifty50_arima_backtest(train_window=100, order=(2, 1, 2)):
     # Store all results
     all_results = []
     successful_backtests = 0
+    backtest_kwargs = {'train_window': train_window, 'order': order, 'engine': engine,
+                       'refit_every': refit_every, 'warm_start': warm_start}
     
-    for i, symbol in enumerate(nifty50_symbols, 1):
-        print(f"\nProgress: {i}/{len(nifty50_symbols)}")
-        
-        try:
-            # Create backtester instance
-            backtester = ARIMABacktester(symbol)
+    if workers == 1:
+        symbol_results = []
+        for i, symbol in enumerate(nifty50_symbols, 1):
+            print(f"\nProgress: {i}/{len(nifty50_symbols)}")
             
-            # Run backtest with rolling window
-            results = backtester.run_backtest(train_window=train_window, order=order)
-            
-            if results is not None:
-                all_results.append(results)
-                successful_backtests += 1
-                
-        except Exception as e:
-            print(f"Error in backtest for {symbol}: {str(e)}")
-            continue
+            try:
+                # Create backtester instance and run backtest with rolling window
+                symbol_results.append(ARIMABacktester(symbol).run_backtest(**backtest_kwargs))
+            except Exception as e:
+                print(f"Error in backtest for {symbol}: {str(e)}")
+                continue
+    else:
+        symbol_results = run_parallel_backtests(nifty50_symbols, backtest_kwargs, workers=workers,
+                                                threads_per_worker=threads_per_worker)
+    
+    for results in symbol_results:
+        if results is not None:
+            all_results.append(results)
+            successful_backtests += 1
     
     # Create summary DataFrame
     if all_results:
@@ -395,6 +683,8 @@ def run_nifty50_arima_backtest(train_window=100, order=(2, 1, 2)):
         print(f"Average Win Rate: {results_df['win_rate'].mean():.1f}%")
         print(f"Average RMSE: {results_df['rmse'].mean():.2f}")
         print(f"Average MAPE: {results_df['mape'].mean():.2f}%")
+        print(f"Average optimizer iterations per symbol: {results_df['fit_iterations'].mean():.0f}")
+        print(f"Average fit time per symbol: {results_df['fit_time'].mean():.2f}s")
         
         # Top performers
         print(f"\nTop 5 ARIMA Performers:")
@@ -1,13 +1,19 @@
-from functools import lru_cache
+import sys
+import os
 
 import yfinance as yf
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from Index import fetch_nifty500_list
 from Index import fetch_nifty50_list
+from utils.disk_cache import disk_cache
 
-@lru_cache(maxsize=64)
+@disk_cache(ttl=None, maxsize=64)
 def get_data(ticker):
     try:
         data = yf.download(ticker,interval='1wk', start="2000-01-01", end="2025-01-01", auto_adjust=False)
@@ -35,38 +41,56 @@ def find_trades(data):
     in_trade = False  # Added flag to track if we are currently in a trade
 
     try:
-        # Calculate cumulative max high up to each month's end
-        daily_data = data.resample('D').ffill()  # Fill forward to ensure daily continuity
-        daily_data['Cumulative_High'] = daily_data['High'].cummax()
-
-        monthly_resampled = daily_data.resample('ME').apply(lambda x: x.iloc[-1])
-        monthly_highs = monthly_resampled['Cumulative_High']
-        monthly_closes = monthly_resampled['Close']
-
-        for i in range(8, len(monthly_closes)):
-            if monthly_closes.index[i] < next_entry_date:
-                continue
-
-            if monthly_closes[i] > monthly_highs[i-1]:
-                entry_date = monthly_closes.index[i]
-                entry_price = monthly_closes[i]
-                entries.append((entry_date, entry_price))
-                print(f"Entry on {entry_date}: {entry_price}")
-
-                weekly_closes_below_ma = data[(data.index > entry_date) & (data['Close'] < data['30W_MA'])]
-
-                if not weekly_closes_below_ma.empty:
-                    exit_date = weekly_closes_below_ma.index[0]
-                    next_entry_date = exit_date
-                    exit_price = weekly_closes_below_ma['Close'][0]
-                    exits.append((exit_date, exit_price))
-                    print(f"Exit on {exit_date}: {exit_price}")
-
-                    profit_loss = exit_price - entry_price
-                    print(f"Profit/Loss for trade: {profit_loss}\n")
-
-                    entry_price = None
-                    in_trade = False  # Exiting a trade
+        # Calculate cumulative max high on the weekly bars
+        weeks = data.index
+        closes = data['Close'].to_numpy()
+        cumulative_highs = data['High'].cummax().to_numpy()
+
+        # Each month end takes the values of the last weekly bar on or before it
+        month_ends = data['Close'].resample('ME').last().index
+        month_pos = np.searchsorted(weeks, month_ends, side='right') - 1
+        monthly_highs = cumulative_highs[month_pos]
+        monthly_closes = closes[month_pos]
+
+        # Months whose close breaks the all-time high of the previous month end
+        breakouts = np.zeros(len(month_ends), dtype=bool)
+        with np.errstate(invalid='ignore'):
+            breakouts[8:] = monthly_closes[8:] > monthly_highs[7:-1]
+        breakout_months = np.flatnonzero(breakouts)
+        breakout_dates = month_ends[breakout_months]
+
+        # Weeks closing below the 30-week MA; the exit is the first one after the entry
+        with np.errstate(invalid='ignore'):
+            below_ma = np.flatnonzero(closes < data['30W_MA'].to_numpy())
+        below_ma_dates = weeks[below_ma]
+
+        k = np.searchsorted(breakout_dates, next_entry_date)
+        while k < len(breakout_months):
+            i = breakout_months[k]
+            entry_date = month_ends[i]
+            entry_price = monthly_closes[i]
+            entries.append((entry_date, entry_price))
+            print(f"Entry on {entry_date}: {entry_price}")
+
+            j = np.searchsorted(below_ma_dates, entry_date, side='right')
+
+            if j < len(below_ma):
+                exit_date = below_ma_dates[j]
+                next_entry_date = exit_date
+                exit_price = closes[below_ma[j]]
+                exits.append((exit_date, exit_price))
+                print(f"Exit on {exit_date}: {exit_price}")
+
+                profit_loss = exit_price - entry_price
+                print(f"Profit/Loss for trade: {profit_loss}\n")
+
+                entry_price = None
+                in_trade = False  # Exiting a trade
+
+                # Skip straight to the first breakout on or after the exit
+                k = np.searchsorted(breakout_dates, next_entry_date)
+            else:
+                k += 1
 
     except Exception as e:
         print(f"Error processing trades: {e}")
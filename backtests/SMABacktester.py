@@ -1,9 +1,154 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from itertools import product
 import matplotlib.pyplot as plt
 
+from utils.helper import download_data
+
+
+def sma_matrix(prices, windows):
+    ''' Simple moving averages of `prices` for every window length at once.
+
+    Returns a dict mapping window -> array of len(prices), NaN until the window is full,
+    all derived from a single cumulative-sum pass over the prices.
+    '''
+    prices = np.asarray(prices, dtype=float)
+    csum = np.concatenate([[0.0], np.cumsum(prices)])
+    smas = {}
+    for window in windows:
+        sma = np.full(len(prices), np.nan)
+        if window <= len(prices):
+            sma[window - 1:] = (csum[window:] - csum[:-window]) / window
+        smas[window] = sma
+    return smas
+
+
+def fold_slice(smas, returns, start, end):
+    ''' Rows start:end of a shared SMA cache (window -> array) and the matching returns. '''
+    return {window: sma[start:end] for window, sma in smas.items()}, returns[start:end]
+
+
+def grid_performance(smas, returns, SMA_S_values, SMA_L_values):
+    ''' Final strategy performance (as returned by test_strategy) for every (SMA_S, SMA_L) pair.
+
+    Mirrors test_strategy: a position of +1/-1 only on the bar where SMA_S crosses above/below
+    SMA_L, applied to the next bar's log return, over the rows left after dropping the
+    warm-up NaNs. The arrays may also be slices of a longer history (e.g. walk-forward folds),
+    in which case the warm-up is whatever leading NaNs the slice still has.
+    Returns an array of shape (len(SMA_S_values), len(SMA_L_values)).
+    '''
+    returns = np.asarray(returns, dtype=float)
+    n = len(returns)
+    long_smas = np.vstack([smas[L] for L in SMA_L_values])
+    t = np.arange(n)
+    performance = np.empty((len(SMA_S_values), len(SMA_L_values)))
+
+    def first_valid(a):
+        finite = np.isfinite(a)
+        return np.where(finite.any(axis=-1), np.argmax(finite, axis=-1), n)
+
+    first_long = first_valid(long_smas)
+    first_return = first_valid(returns)
+
+    for row, S in enumerate(SMA_S_values):
+        diff = smas[S][None, :] - long_smas
+        position = np.zeros_like(diff)
+        position[:, 1:] = (((diff[:, :-1] < 0) & (diff[:, 1:] > 0)).astype(float)
+                           - ((diff[:, :-1] > 0) & (diff[:, 1:] < 0)).astype(float))
+        # The first row left after dropna has no previous row, so it never carries a position
+        first_row = np.maximum(np.maximum(first_long, first_valid(smas[S])), first_return)
+        position[t[None, :] <= first_row[:, None]] = 0
+        performance[row] = np.exp(position[:, :-1] @ np.nan_to_num(returns[1:]))
+
+    return np.round(performance, 6)
+
+
+def panel_sma(prices, window):
+    ''' Rolling mean down each column of a (dates x symbols) array, NaN until a full window of prices exists. '''
+    valid = np.isfinite(prices)
+    csum = np.concatenate([np.zeros((1, prices.shape[1])), np.cumsum(np.where(valid, prices, 0.0), axis=0)])
+    count = np.concatenate([np.zeros((1, prices.shape[1])), np.cumsum(valid, axis=0)])
+    sma = np.full(prices.shape, np.nan)
+    if window <= len(prices):
+        full = (count[window:] - count[:-window]) == window
+        sma[window - 1:] = np.where(full, (csum[window:] - csum[:-window]) / window, np.nan)
+    return sma
+
+
+def panel_backtest(prices, SMA_S, SMA_L):
+    ''' SMA crossover backtest for many symbols in one vectorized pass.
+
+    Parameters
+    ----------
+    prices: pd.DataFrame
+        aligned close prices, dates x symbols (NaN before a symbol's first bar)
+
+    Applies the same rules as SMABacktester.test_strategy to every column and returns a
+    per-symbol table with buy-and-hold and strategy performance, outperformance and crossovers.
+    Gaps after a symbol's first bar are forward-filled so the columns stay aligned.
+    '''
+    values = prices.ffill().values.astype(float)
+    T = len(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.log(values[1:] / values[:-1])
+
+    diff = panel_sma(values, SMA_S) - panel_sma(values, SMA_L)
+    position = np.zeros_like(diff)
+    position[1:] = (((diff[:-1] < 0) & (diff[1:] > 0)).astype(float)
+                    - ((diff[:-1] > 0) & (diff[1:] < 0)).astype(float))
+
+    # First row test_strategy keeps after dropna: SMAs and the first return must all be available
+    first_price = np.argmax(np.isfinite(values), axis=0)
+    first_row = first_price + max(SMA_S - 1, SMA_L - 1, 1)
+    rows = np.arange(T)[:, None]
+    position[rows <= first_row[None, :]] = 0
+    in_frame = (rows[1:] > first_row[None, :]) & np.isfinite(returns)
+
+    strategy = np.exp(np.nansum(position[:-1] * np.where(in_frame, returns, 0.0), axis=0))
+    buy_hold = np.exp(np.nansum(np.where(in_frame, returns, 0.0), axis=0))
+
+    table = pd.DataFrame({
+        "SMA_S": SMA_S,
+        "SMA_L": SMA_L,
+        "bars": in_frame.sum(axis=0),
+        "buy_hold": np.round(buy_hold, 6),
+        "strategy": np.round(strategy, 6),
+        "outperformance": np.round(strategy - buy_hold, 6),
+        "crossovers": (position != 0).sum(axis=0),
+    }, index=pd.Index(prices.columns, name="symbol"))
+    # Symbols without enough history for the long SMA have nothing to evaluate
+    return table[table["bars"] > 0]
+
+
+def pair_trades(index, position, price):
+    ''' Pairs entries (+1) with the following exits (-1) from a crossover position series.
+
+    Same rules as a row-by-row state machine starting flat at row 1: a +1 opens a trade only
+    when flat, a -1 closes it only when in a trade, and a trade still open at the end is dropped.
+    Returns a list of (entry_date, exit_date, pl_pct) tuples.
+    '''
+    position = np.asarray(position)
+    price = np.asarray(price, dtype=float)
+
+    # Only non-zero rows change state, and repeated signals of the same sign are ignored
+    events = np.flatnonzero(position[1:] != 0) + 1
+    signs = position[events]
+    keep = np.ones(len(events), dtype=bool)
+    keep[1:] = signs[1:] != signs[:-1]
+    events, signs = events[keep], signs[keep]
+
+    # An exit before any entry is ignored; after that, signs alternate entry/exit
+    if len(events) and signs[0] == -1:
+        events = events[1:]
+    entries, exits = events[0::2], events[1::2]
+    entries = entries[:len(exits)]
+
+    entry_prices, exit_prices = price[entries], price[exits]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pl_pct = np.where(entry_prices != 0, (exit_prices - entry_prices) / entry_prices * 100, 0)
+    return list(zip(index[entries], index[exits], pl_pct))
+
+
 class SMABacktester():
 
     def __init__(self, symbol, SMA_S, SMA_L, start, end):
@@ -24,8 +169,7 @@ class SMABacktester():
 
     def get_data(self):
 
-        raw = yf.download(self.symbol, start =self.start, end= self.end, interval='1d', progress=False)
-        raw.columns = [col[0].replace(r'/.+$', '') if isinstance(col, tuple) else col for col in raw.columns]
+        raw = download_data(self.symbol, interval='1d', start=self.start, end=self.end).copy()
 
         # raw = pd.read_csv("forex_pairs.csv", parse_dates=["Date"], index_col="Date")
         # raw = raw[self.symbol].to_frame().dropna()
@@ -54,9 +198,10 @@ class SMABacktester():
             self.SMA_L = SMA_L
             self.data["SMA_L"] = self.data["price"].rolling(self.SMA_L).mean()
 
-    def test_strategy(self):
+    def test_strategy(self, track_trades=True):
         ''' Backtests the SMA-based trading strategy.
         Prints the entry/exit dates and the respective profit/loss in percentage.
+        Set track_trades=False to skip trade extraction (e.g. during parameter sweeps).
         '''
         data = self.data.copy().dropna()
         data["position"] = np.where((data["SMA_S"].shift(1) < data["SMA_L"].shift(1)) &
@@ -68,25 +213,10 @@ class SMABacktester():
         data.dropna(inplace=True)
 
         # Track trades and calculate profit/loss
-        in_position = False
-        entry_date = None
-        entry_price = None
-
-        for i in range(1, len(data)):
-            if data["position"].iloc[i] == 1:  # Enter a new position (buy)
-                if not in_position:  # Only enter if not in a position
-                    entry_date = data.index[i]
-                    entry_price = data["price"].iloc[i]
-                    in_position = True
-
-            elif data["position"].iloc[i] == -1:  # Exit position (sell)
-                if in_position:  # Only exit if in a position
-                    exit_date = data.index[i]
-                    exit_price = data["price"].iloc[i]
-                    pl_pct = (exit_price - entry_price) / entry_price * 100 if entry_price != 0 else 0
-                    self.entry_exit_signals.append((entry_date, exit_date, pl_pct))
-                    print(f"Entry: {entry_date}, Exit: {exit_date}, P&L: {pl_pct:.2f}%")
-                    in_position = False
+        if track_trades:
+            for entry_date, exit_date, pl_pct in pair_trades(data.index, data["position"].values, data["price"].values):
+                self.entry_exit_signals.append((entry_date, exit_date, pl_pct))
+                print(f"Entry: {entry_date}, Exit: {exit_date}, P&L: {pl_pct:.2f}%")
 
         data["creturns"] = data["returns"].cumsum().apply(np.exp)
         data["cstrategy"] = data["strategy"].cumsum().apply(np.exp)
@@ -106,21 +236,33 @@ class SMABacktester():
             self.results[["creturns", "cstrategy"]].plot(title=title, figsize=(12, 8))
             plt.show()
 
-    def optimize_parameters(self, SMA_S_range, SMA_L_range):
+    def optimize_parameters(self, SMA_S_range, SMA_L_range, vectorized=True):
         ''' Finds the optimal strategy (global maximum) given the SMA parameter ranges.
 
         Parameters
         ----------
         SMA_S_range, SMA_L_range: tuple
             tuples of the form (start, end, step size)
+        vectorized: bool
+            evaluate the whole grid at once from one SMA matrix (see grid_performance)
+            instead of calling test_strategy per combination
         '''
         combinations = list(product(range(*SMA_S_range), range(*SMA_L_range)))
 
+        # The grid engine assumes the only gaps are the leading NaNs that test_strategy drops
+        base = self.data.drop(columns=["SMA_S", "SMA_L"])
+        gap_free = base.iloc[1:].notna().all().all()
+
         # test all combinations
-        results = []
-        for comb in combinations:
-            self.set_parameters(comb[0], comb[1])
-            results.append(self.test_strategy()[0])
+        if vectorized and gap_free:
+            S_values, L_values = list(range(*SMA_S_range)), list(range(*SMA_L_range))
+            smas = sma_matrix(self.data["price"].values, set(S_values) | set(L_values))
+            results = list(grid_performance(smas, self.data["returns"].values, S_values, L_values).ravel())
+        else:
+            results = []
+            for comb in combinations:
+                self.set_parameters(comb[0], comb[1])
+                results.append(self.test_strategy(track_trades=False)[0])
 
         best_perf = np.max(results)  # best performance
         opt = combinations[np.argmax(results)]  # optimal parameters
@@ -134,4 +276,56 @@ class SMABacktester():
         many_results["performance"] = results
         self.results_overview = many_results
 
-        return opt, best_perf
\ No newline at end of file
+        return opt, best_perf
+
+    def walk_forward(self, SMA_S_range, SMA_L_range, train_size=500, test_size=125, anchored=False):
+        ''' Walk-forward optimization: pick the best SMA pair on each training fold and
+        evaluate it on the following out-of-sample fold.
+
+        The SMAs for every window length are computed once over the full history and each
+        fold only slices that shared cache, so indicators are never recomputed per fold.
+
+        Parameters
+        ----------
+        SMA_S_range, SMA_L_range: tuple
+            tuples of the form (start, end, step size)
+        train_size, test_size: int
+            number of bars in each training / testing fold
+        anchored: bool
+            if True every training fold starts at the first bar instead of rolling forward
+        '''
+        base = self.data.drop(columns=["SMA_S", "SMA_L"])
+        if not base.iloc[1:].notna().all().all():
+            print("Walk-forward optimization needs gap-free data.")
+            return None
+
+        S_values, L_values = list(range(*SMA_S_range)), list(range(*SMA_L_range))
+        smas = sma_matrix(self.data["price"].values, set(S_values) | set(L_values))
+        returns = self.data["returns"].values
+        index = self.data.index
+
+        folds = []
+        for test_start in range(train_size, len(self.data) - 1, test_size):
+            train_start = 0 if anchored else test_start - train_size
+            test_end = min(test_start + test_size, len(self.data))
+
+            train_smas, train_returns = fold_slice(smas, returns, train_start, test_start)
+            in_sample = grid_performance(train_smas, train_returns, S_values, L_values)
+            best = np.unravel_index(np.argmax(in_sample), in_sample.shape)
+            SMA_S, SMA_L = S_values[best[0]], L_values[best[1]]
+
+            test_smas, test_returns = fold_slice(smas, returns, test_start, test_end)
+            out_of_sample = grid_performance(test_smas, test_returns, [SMA_S], [SMA_L])[0, 0]
+            # Same row convention as test_strategy's creturns: the first bar of the fold only sets the base
+            buy_hold = round(np.exp(np.nansum(test_returns[1:])), 6)
+
+            folds.append({
+                "train_start": index[train_start], "train_end": index[test_start - 1],
+                "test_start": index[test_start], "test_end": index[test_end - 1],
+                "SMA_S": SMA_S, "SMA_L": SMA_L,
+                "in_sample": in_sample[best], "out_of_sample": out_of_sample,
+                "buy_hold": buy_hold, "outperformance": round(out_of_sample - buy_hold, 6)
+            })
+
+        self.walk_forward_results = pd.DataFrame(folds)
+        return self.walk_forward_results
\ No newline at end of file
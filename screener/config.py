@@ -8,6 +8,8 @@ SCREENER_PASSWORD = "your_password_here"
 # Scraping Configuration
 MAX_RETRIES = 3
 DELAY_RANGE = (1, 3)  # seconds between requests
+REQUESTS_PER_SECOND = 2.0  # shared rate limit per host across all scraper threads
+SCRAPE_WORKERS = 4  # pages fetched / parsed concurrently
 
 # Date Range Configuration
 DEFAULT_START_DATE = "2025-07-04"
@@ -18,15 +18,25 @@ import random
 import sys
 import os
 import ast
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
-# Add utils folder to path for Piotroski score
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'utils'))
+# Add the repository root to path for utils (Piotroski score, rate limiting)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 try:
-    from helper import get_piotroski_score
+    from utils.helper import get_piotroski_score
     print("✅ Loaded Piotroski score function from utils/helper.py")
 except ImportError:
     print("⚠️  Warning: Could not import Piotroski score function from utils/helper.py")
     get_piotroski_score = None
+from utils.rate_limit import HostRateLimiter
+
+# Defaults for settings that older config_local.py files may not define
+REQUESTS_PER_SECOND = 2.0
+SCRAPE_WORKERS = 4
+
+# Pages tried when page 1 shows no pagination but page 2 has companies
+FALLBACK_PAGES = 5
 
 # Try to import local config
 try:
@@ -52,6 +62,14 @@ class DateRangeScreenerScraper:
         self.session = requests.Session()
         self.is_authenticated = False
         
+        # requests.Session is not guaranteed thread-safe, so worker threads get their own copy
+        self._local = threading.local()
+        self._local.session = self.session
+        
+        # One token bucket per host, shared by every request this session makes
+        self.rate_limiter = HostRateLimiter({'www.screener.in': REQUESTS_PER_SECOND},
+                                            default_rate=REQUESTS_PER_SECOND)
+        
         # Create output directory if it doesn't exist
         if not os.path.exists(OUTPUT_DIR):
             os.makedirs(OUTPUT_DIR)
@@ -66,13 +84,28 @@ class DateRangeScreenerScraper:
             'Upgrade-Insecure-Requests': '1',
         })
         
+    def _thread_session(self) -> requests.Session:
+        """Session for the calling thread, copied from the logged-in one on first use"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.session.headers)
+            session.cookies.update(self.session.cookies)
+            self._local.session = session
+        return session
+    
+    def _get(self, url: str, **kwargs):
+        """session.get throttled by the shared per-host rate limiter"""
+        self.rate_limiter.acquire(url)
+        return self._thread_session().get(url, **kwargs)
+    
     def login(self) -> bool:
         """Login to Screener.in"""
         try:
             logger.info("Attempting to login to Screener.in...")
             
             # Get login page
-            response = self.session.get(self.login_url, timeout=15)
+            response = self._get(self.login_url, timeout=15)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -117,11 +150,29 @@ class DateRangeScreenerScraper:
     
     def scrape_page(self, url: str) -> List[Dict]:
         """Scrape a single page for company results"""
+        content = self.fetch_page(url)
+        if content is None:
+            return []
+        return self.parse_page(content, url)
+    
+    def fetch_page(self, url: str) -> Optional[bytes]:
+        """Download a results page, returning None on failure"""
         try:
-            response = self.session.get(url, timeout=15)
+            response = self._get(url, timeout=15)
             response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            return response.content
+        except Exception as e:
+            logger.error(f"Error fetching {url}: {e}")
+            return None
+    
+    def _find_company_sections(self, soup) -> List:
+        """Company sections on a results page"""
+        return soup.find_all('div', class_='flex-row flex-space-between flex-align-center margin-top-32 margin-bottom-16 margin-left-4 margin-right-4')
+    
+    def parse_page(self, content, url: str) -> List[Dict]:
+        """Parse a downloaded results page into company records (with their enrichment lookups)"""
+        try:
+            soup = BeautifulSoup(content, 'html.parser')
             companies = []
             
             # Extract date from URL
@@ -137,7 +188,7 @@ class DateRangeScreenerScraper:
                     f.write(str(soup))
             
             # Look for all company sections directly
-            company_sections = soup.find_all('div', class_='flex-row flex-space-between flex-align-center margin-top-32 margin-bottom-16 margin-left-4 margin-right-4')
+            company_sections = self._find_company_sections(soup)
             logger.info(f"Found {len(company_sections)} company sections")
             
             # Filter out sections that don't have company links
@@ -403,11 +454,19 @@ class DateRangeScreenerScraper:
     def get_total_pages(self, url: str) -> int:
         """Get total number of pages for a given date"""
         try:
-            response = self.session.get(url, timeout=15)
+            response = self._get(url, timeout=15)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
+            return self._parse_total_pages(soup)
             
+        except Exception as e:
+            logger.warning(f"Error getting total pages for {url}: {e}")
+            return 1
+    
+    def _parse_total_pages(self, soup) -> int:
+        """Read the number of pages from an already downloaded first page"""
+        try:
             # Look for pagination controls - try multiple selectors
             pagination_selectors = [
                 'div.pagination',
@@ -455,7 +514,7 @@ class DateRangeScreenerScraper:
             return 1
             
         except Exception as e:
-            logger.warning(f"Error getting total pages for {url}: {e}")
+            logger.warning(f"Error reading total pages: {e}")
             return 1
     
     def get_announcement_time_from_nse(self, company_name: str) -> str:
@@ -492,17 +551,16 @@ class DateRangeScreenerScraper:
             }
             
             # First, visit the main NSE page to get cookies
-            main_response = self.session.get('https://www.nseindia.com/', headers=nse_headers, timeout=15)
+            main_response = self._get('https://www.nseindia.com/', headers=nse_headers, timeout=15)
             main_response.raise_for_status()
             
             # Add a small delay
-            import time
             time.sleep(2)
             
             # Try to get financial results via API first
             api_url = f"https://www.nseindia.com/api/quote-equity?symbol={company_symbol}"
             try:
-                api_response = self.session.get(api_url, headers=nse_headers, timeout=15)
+                api_response = self._get(api_url, headers=nse_headers, timeout=15)
                 if api_response.status_code == 200:
                     api_data = api_response.json()
                     # Look for announcement time in API response
@@ -514,7 +572,7 @@ class DateRangeScreenerScraper:
                 logger.debug(f"API call failed for {company_name}: {e}")
             
             # Fallback to scraping the page
-            response = self.session.get(nse_url, headers=nse_headers, timeout=15)
+            response = self._get(nse_url, headers=nse_headers, timeout=15)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -676,7 +734,7 @@ class DateRangeScreenerScraper:
             # Construct URL for shareholding pattern
             shareholding_url = f"{self.base_url}/company/{company_symbol}/consolidated/"
             
-            response = self.session.get(shareholding_url, timeout=15)
+            response = self._get(shareholding_url, timeout=15)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -801,7 +859,7 @@ class DateRangeScreenerScraper:
             if '#quarters' not in company_url:
                 company_url = company_url + '#quarters'
             
-            response = self.session.get(company_url, timeout=15)
+            response = self._get(company_url, timeout=15)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -842,72 +900,86 @@ class DateRangeScreenerScraper:
             start = datetime.strptime(start_date, '%Y-%m-%d')
             end = datetime.strptime(end_date, '%Y-%m-%d')
             
-            all_companies = []
+            dates = []
             current = start
-            
             while current <= end:
-                date_str = current.strftime('%Y-%m-%d')
-                day = current.day
-                month = current.month
-                year = current.year
-                
-                # Create base URL for this date
-                base_url = f"{self.results_url}?all=&result_update_date__day={day}&result_update_date__month={month}&result_update_date__year={year}"
-                
-                print(f"Scraping {date_str}: {base_url}")
+                dates.append(current)
+                current += timedelta(days=1)
+            
+            # Create base URL for each date
+            base_urls = {
+                day.strftime('%Y-%m-%d'): f"{self.results_url}?all=&result_update_date__day={day.day}&result_update_date__month={day.month}&result_update_date__year={day.year}"
+                for day in dates
+            }
+            
+            page_contents = {}
+            with ThreadPoolExecutor(max_workers=SCRAPE_WORKERS) as fetch_pool, \
+                    ThreadPoolExecutor(max_workers=SCRAPE_WORKERS) as parse_pool:
+                # Fetch the first page of every date concurrently; the shared rate limiter paces the requests
+                first_pages = {date_str: fetch_pool.submit(self.fetch_page, f"{base_url}&p=1")
+                               for date_str, base_url in base_urls.items()}
                 
-                # Get total pages for this date
-                total_pages = self.get_total_pages(base_url)
-                print(f"  Total pages for {date_str}: {total_pages}")
+                # Discover the page count from page 1 itself instead of requesting it again
+                page_jobs = {}
+                probes = set()
+                for date_str, future in first_pages.items():
+                    content = future.result()
+                    if content is None:
+                        print(f"  Could not load {date_str}")
+                        continue
+                    page_contents[(date_str, 1)] = content
+                    
+                    soup = BeautifulSoup(content, 'html.parser')
+                    total_pages = self._parse_total_pages(soup)
+                    print(f"  Total pages for {date_str}: {total_pages}")
+                    
+                    # Without pagination controls, page 2 is fetched as a probe like any other page
+                    if total_pages == 1:
+                        logger.info("Pagination detection shows 1 page, but checking for additional pages...")
+                        page_jobs[(date_str, 2)] = fetch_pool.submit(self.fetch_page, f"{base_urls[date_str]}&p=2")
+                        probes.add((date_str, 2))
+                    for page in range(2, total_pages + 1):
+                        page_jobs[(date_str, page)] = fetch_pool.submit(self.fetch_page, f"{base_urls[date_str]}&p={page}")
                 
-                # Fallback: If detection shows only 1 page but we know there should be more
-                # (based on the user's observation of 101 results), try pages 2-5
-                if total_pages == 1:
-                    logger.info("Pagination detection shows 1 page, but checking for additional pages...")
-                    # Try to access page 2 to see if it exists
-                    test_page2_url = f"{base_url}&p=2"
-                    try:
-                        test_response = self.session.get(test_page2_url, timeout=10)
-                        if test_response.status_code == 200:
-                            test_soup = BeautifulSoup(test_response.content, 'html.parser')
-                            # Check if page 2 has company data (not login page)
-                            test_companies = test_soup.find_all('div', class_='flex-row flex-space-between flex-align-center margin-top-32 margin-bottom-16 margin-left-4 margin-right-4')
-                            if len(test_companies) > 0:
-                                logger.info("Page 2 exists with company data, updating total pages to 5")
-                                total_pages = 5
-                                print(f"  Updated total pages for {date_str}: {total_pages}")
-                    except Exception as e:
-                        logger.warning(f"Error testing page 2: {e}")
+                # Parse (and enrich) pages in a worker pool as soon as they arrive
+                parse_jobs = {key: parse_pool.submit(self.parse_page, content, f"{base_urls[key[0]]}&p={key[1]}")
+                              for key, content in page_contents.items()}
+                pending = {future: key for key, future in page_jobs.items()}
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        key = pending.pop(future)
+                        content = future.result()
+                        if content is None:
+                            continue
+                        if key in probes:
+                            # An empty page 2 means page 1 was the only page; otherwise queue the fallback pages
+                            if not self._find_company_sections(BeautifulSoup(content, 'html.parser')):
+                                continue
+                            date_str = key[0]
+                            logger.info(f"Page 2 exists with company data, updating total pages to {FALLBACK_PAGES}")
+                            print(f"  Updated total pages for {date_str}: {FALLBACK_PAGES}")
+                            for page in range(3, FALLBACK_PAGES + 1):
+                                pending[fetch_pool.submit(self.fetch_page, f"{base_urls[date_str]}&p={page}")] = (date_str, page)
+                        parse_jobs[key] = parse_pool.submit(self.parse_page, content, f"{base_urls[key[0]]}&p={key[1]}")
                 
+                page_companies = {key: future.result() for key, future in parse_jobs.items()}
+            
+            # Collect in date and page order so the output is reproducible
+            all_companies = []
+            for date_str in base_urls:
                 date_companies = []
-                
-                # Scrape all pages for this date
-                for page in range(1, total_pages + 1):
-                    page_url = f"{base_url}&p={page}"
-                    print(f"    Scraping page {page}/{total_pages}: {page_url}")
-                    
-                    companies = self.scrape_page(page_url)
-                    
+                for key in sorted(key for key in page_companies if key[0] == date_str):
+                    companies = page_companies[key]
                     if companies:
                         date_companies.extend(companies)
-                        print(f"      Found {len(companies)} companies on page {page}")
-                    else:
-                        print(f"      No companies found on page {page}")
-                    
-                    # Small delay between pages
-                    time.sleep(1)
+                        print(f"    {date_str} page {key[1]}: {len(companies)} companies")
                 
                 if date_companies:
                     all_companies.extend(date_companies)
                     print(f"  Total companies for {date_str}: {len(date_companies)}")
                 else:
                     print(f"  No companies found for {date_str}")
-                
-                # Move to next date
-                current += timedelta(days=1)
-                
-                # Small delay to be respectful
-                time.sleep(2)
             
             # Convert to DataFrame
             df = pd.DataFrame(all_companies)
@@ -20,6 +20,7 @@ import matplotlib.pyplot as plt
 import statsmodels.api as sm
 from statsmodels.tsa.arima.model import ARIMA
 import pandas as pd
+import numpy as np
 import time
 from utils.helper import download_data
 
@@ -42,11 +43,84 @@ def check_stationarity_quick(the_series, name):
         print("❌ NON-STATIONARY: Need to transform the data.")
     print()
 
+def rolling_ar_forecasts(values, train_window=100, lags=1):
+    """
+    One-step-ahead forecasts from a rolling OLS AR(p) fit, for every window at once.
+
+    values: array of shape (T,) or (T, N) for N series side by side.
+    For each t >= train_window the model x_s = c + b_1 x_{s-1} + ... + b_p x_{s-p}
+    is fitted on values[t-train_window:t] and used to forecast values[t].
+    The normal equations are built from rolling sums of the lagged cross products
+    (cumulative sums differenced over the window), so no per-window fitting loop is needed.
+    Returns an array shaped like `values`, NaN where no full window of valid data exists.
+    """
+    values = np.asarray(values, dtype=float)
+    single = values.ndim == 1
+    if single:
+        values = values[:, None]
+    T, N = values.shape
+    k = lags + 1
+    pairs = train_window - lags  # regression rows available inside one window
+
+    # Row s of the regression: y_s = values[s], z_s = [1, values[s-1], ..., values[s-p]]
+    z = np.ones((T, N, k))
+    z[:lags] = np.nan
+    for lag in range(1, k):
+        z[lag:, :, lag] = values[:-lag]
+    valid = np.isfinite(values) & np.isfinite(z).all(axis=2)
+    y = np.where(valid, values, 0.0)
+    z = np.where(valid[:, :, None], z, 0.0)
+
+    zz = np.einsum('tni,tnj->tnij', z, z)
+    zy = z * y[:, :, None]
+    count = valid.astype(float)
+
+    def window_sums(a):
+        # Sum over regression rows s in [t - pairs, t) for every t (row t itself is excluded)
+        c = np.concatenate([np.zeros((1,) + a.shape[1:]), np.cumsum(a, axis=0)])
+        out = np.full((T,) + a.shape[1:], np.nan)
+        out[train_window:] = c[train_window:T] - c[train_window - pairs:T - pairs]
+        return out
+
+    szz, szy, n = window_sums(zz), window_sums(zy), window_sums(count)
+
+    forecasts = np.full((T, N), np.nan)
+    full = n == pairs
+    if full.any():
+        try:
+            beta = np.linalg.solve(szz[full], szy[full][..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            # A degenerate window (e.g. constant returns) makes the system singular; fall back to least squares
+            beta = np.einsum('mij,mj->mi', np.linalg.pinv(szz[full]), szy[full])
+        # Regressors for the forecast of values[t] are [1, values[t-1], ..., values[t-p]]
+        x_next = np.ones((T, N, k))
+        for lag in range(1, k):
+            x_next[lag:, :, lag] = values[:-lag]
+        forecasts[full] = np.einsum('mi,mi->m', x_next[full], beta)
+
+    return forecasts[:, 0] if single else forecasts
+
+
 # Create rolling forecasts
-def create_ar_strategy(data, train_window=100):
+def create_ar_strategy(data, train_window=100, lags=1, method='ols'):
     """
-    Build a trading strategy using rolling AR(1) forecasts
+    Build a trading strategy using rolling AR(p) forecasts.
+    method='ols' computes every window in one vectorized pass (see rolling_ar_forecasts);
+    method='mle' fits ARIMA(p, 0, 0) by maximum likelihood per window and is kept as the reference.
     """
+    if method == 'ols':
+        # The closed-form path needs contiguous observations, so drop missing returns up front
+        data = data.dropna()
+        forecasts = rolling_ar_forecasts(data.values, train_window=train_window, lags=lags)[train_window:]
+        return pd.DataFrame({
+            'actual_returns': data.values[train_window:],
+            'predicted_returns': forecasts,
+            'signal': np.where(forecasts > 0, 1, -1)
+        }, index=pd.Index(data.index[train_window:], name='date'))
+
+    if method != 'mle':
+        raise ValueError(f"Unknown method '{method}', expected 'ols' or 'mle'")
+
     results = []
     
     for i in range(train_window, len(data)):
@@ -55,12 +129,12 @@ def create_ar_strategy(data, train_window=100):
             print(f"Processed {i}/{len(data)}")
         train_series = data.iloc[i-train_window:i]
         
-        # Fit AR(1) model (ARIMA with order=(1, 0, 0))
-        init_model = ARIMA(train_series, order=(1, 0, 0))
+        # Fit AR(p) model (ARIMA with order=(p, 0, 0))
+        init_model = ARIMA(train_series, order=(lags, 0, 0))
         fitted_model = init_model.fit()
         
         # Make one-step-ahead forecast
-        forecast = fitted_model.forecast(steps=1)[0]
+        forecast = fitted_model.forecast(steps=1).iloc[0]
         
         # Store result
         results.append({
@@ -73,6 +147,24 @@ def create_ar_strategy(data, train_window=100):
     return pd.DataFrame(results).set_index('date')
 
 
+def create_ar_strategy_panel(returns, train_window=100, lags=1):
+    """
+    Rolling OLS AR(p) strategy for many symbols at once.
+    returns: DataFrame of returns (dates x symbols). Returns {symbol: DataFrame} with
+    the same actual_returns / predicted_returns / signal columns as create_ar_strategy.
+    """
+    forecasts = rolling_ar_forecasts(returns.values, train_window=train_window, lags=lags)
+    strategies = {}
+    for j, symbol in enumerate(returns.columns):
+        mask = np.isfinite(forecasts[:, j])
+        strategies[symbol] = pd.DataFrame({
+            'actual_returns': returns.values[mask, j],
+            'predicted_returns': forecasts[mask, j],
+            'signal': np.where(forecasts[mask, j] > 0, 1, -1)
+        }, index=pd.Index(returns.index[mask], name='date'))
+    return strategies
+
+
 ticker = 'RELIANCE.NS'
 data = download_data(ticker,interval='1wk',period='10y')
 data['weekly_return'] = data['Close'].pct_change()  
@@ -1,22 +1,20 @@
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 
 from data.Index import fetch_nifty500_list, fetch_nifty_list_all
 from data.Sectors import sector_mapping
-from utils.helper import get_piotroski_score
+from utils.helper import download_data, download_batch, fundamentals_table, piotroski_scores
+from utils.ath_state import ATHState
 
 
 # Define a function to get historical data and check for new all-time highs
-def check_new_all_time_high(ticker, period='10y'):
-    # Fetch historical market data
-    data = yf.download(ticker, period=period, interval='1mo' , progress=False)
-
-
-    data.columns = [col[0].replace(r'/.+$', '') if isinstance(col, tuple) else col for col in data.columns]
+def check_new_all_time_high(ticker, period='10y', data=None):
+    # Fetch historical market data unless it was already loaded in a batch
+    if data is None:
+        data = download_data(ticker, interval='1mo', period=period)
 
     if data.empty or len(data) < 1:
         return False, None
@@ -45,6 +43,31 @@ def check_new_all_time_high(ticker, period='10y'):
     return False, None
 
 
+def scan_new_all_time_highs(tickers, interval='1mo', period='10y', state=None):
+    """
+    Vectorized version of check_new_all_time_high over a whole universe.
+    Symbols already in the ATH state table are only topped up with bars from their
+    last stored bar onwards; new symbols are seeded from `period` of history.
+    Returns the state rows of the tickers whose last close broke an ATH set at least 2 months ago.
+    """
+    state = state or ATHState(interval)
+    known = state.symbols()
+    new_tickers = [ticker for ticker in tickers if ticker not in known]
+    tracked = [ticker for ticker in tickers if ticker in known]
+
+    if new_tickers:
+        state.update(download_batch(new_tickers, interval=interval, period=period))
+    if tracked:
+        since = state.table.loc[tracked, 'last_date'].min()
+        state.update(download_batch(tracked, interval=interval, start=since))
+    state.save()
+
+    table = state.table.loc[state.table.index.intersection(tickers)]
+    three_months_ago = datetime.now() - pd.DateOffset(months=2)
+    is_new_high = (table['last_close'] > table['ath_high']) & (table['ath_date'] <= three_months_ago)
+    return table[is_new_high]
+
+
 def main():
     # Get a list of Nifty 500 tickers (these are just examples; you'll need to get the full list)
     nifty500_tickers = fetch_nifty_list_all()
@@ -53,20 +76,18 @@ def main():
     new_highs = []
     groupByTickers = {}
 
-    # Check each stock in the list
-    for ticker in nifty500_tickers:
-        try:
-            is_new_high, high_date = check_new_all_time_high(ticker)
-            
-            if is_new_high:
-                sector = sector_mapping.get(ticker, "Unknown")
-                if sector not in groupByTickers:
-                    groupByTickers[sector] = []
-                groupByTickers[sector].append((ticker, high_date))
-                print(f"********************! {ticker} has hit a new all-time high on {high_date} | sector {sector} !********************")
-                new_highs.append((ticker, high_date))
-        except Exception as e:
-            print(f"Error processing {ticker}: {str(e)}")
+    # Compare every latest close with its stored all-time high in one pass
+    for ticker, row in scan_new_all_time_highs(nifty500_tickers).iterrows():
+        high_date = row['last_date']
+        sector = sector_mapping.get(ticker, "Unknown")
+        if sector not in groupByTickers:
+            groupByTickers[sector] = []
+        groupByTickers[sector].append((ticker, high_date))
+        print(f"********************! {ticker} has hit a new all-time high on {high_date} | sector {sector} !********************")
+        new_highs.append((ticker, high_date))
+
+    # Score every new high in one batch
+    scores = piotroski_scores(fundamentals_table([ticker for ticker, _ in new_highs]))['score']
 
     # Output all stocks that have hit new highs, grouped by sector
     print("Stocks hitting new all-time highs grouped by sector:")
@@ -74,7 +95,7 @@ def main():
         print(f"Sector: {sector}")
         for ticker, high_date in tickers:
             print(f"  {ticker}: {high_date}")
-            piotroski_score = get_piotroski_score(ticker)
+            piotroski_score = scores.get(ticker)
             if piotroski_score is not None:
                 print(f"{ticker}: Piotroski Score = {piotroski_score}/9")
             else:
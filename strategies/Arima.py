@@ -42,16 +42,31 @@ import pandas as pd
 import numpy as np
 import time
 from utils.helper import download_data
+from backtests.ARIMABacktester import sharded_arima_forecasts
 
 
-def create_arima_strategy(price_data, train_window=200, order=(2, 1, 2)):
+def create_arima_strategy(price_data, train_window=200, order=(2, 1, 2), workers=1):
     """
     Build trading strategy using rolling ARIMA forecasts on price data.
     Returns a DataFrame with predictions and trading signals.
+    With workers > 1 (or None for all cores) the forecast range is split into
+    contiguous blocks fitted in separate processes; the forecasts are the same.
     """
     results = []
 
     print(f"Training window: {train_window} observations")
+
+    if workers != 1:
+        forecasts, _ = sharded_arima_forecasts(price_data, train_window, workers=workers,
+                                               train_window=train_window, order=order, progress_every=100)
+        for i, forecast in forecasts.items():
+            results.append({
+                'date': price_data.index[i],
+                'actual_price': price_data.iloc[i],
+                'predicted_price': forecast,
+                'signal': 1 if forecast > price_data.iloc[i - 1] else -1
+            })
+        return pd.DataFrame(results).set_index('date')
     
     for i in range(train_window, len(price_data)):
         if i % 100 == 0:
@@ -113,51 +128,52 @@ def compare_strategies(arima_results, firm_name):
     }
 
 
-order = (1, 1, 1)
-firm_names = fetch_nifty50_list()
+if __name__ == "__main__":
+    order = (1, 1, 1)
+    firm_names = fetch_nifty50_list()
 
-for firm_name in firm_names:
+    for firm_name in firm_names:
 
 
-    df_weekly = download_data(firm_name, interval='1wk', period='10y')
-    print(f"Building ARIMA{order} strategy on {firm_name} stock weekly prices...")
-    print("This will take a while. We're fitting 400+ models...\n")
+        df_weekly = download_data(firm_name, interval='1wk', period='10y')
+        print(f"Building ARIMA{order} strategy on {firm_name} stock weekly prices...")
+        print("This will take a while. We're fitting 400+ models...\n")
 
-    # Start timing
-    start_time = time.time()
+        # Start timing
+        start_time = time.time()
 
-    # Run the rolling ARIMA strategy on crude oil adjusted close prices
-    arima_strategy = create_arima_strategy(df_weekly['Close'], order=order)
+        # Run the rolling ARIMA strategy on crude oil adjusted close prices
+        arima_strategy = create_arima_strategy(df_weekly['Close'], order=order)
 
-    # Calculate elapsed time
-    elapsed_time = time.time() - start_time
-    minutes = int(elapsed_time / 60)
-    seconds = elapsed_time % 60
+        # Calculate elapsed time
+        elapsed_time = time.time() - start_time
+        minutes = int(elapsed_time / 60)
+        seconds = elapsed_time % 60
 
-    print(f"\n✅ Strategy built! Generated {len(arima_strategy)} trading signals")
-    print(f"⏱️ Time taken: {minutes}m {seconds:.1f}s")
-    print(f"Period: {arima_strategy.index[0].date()} to {arima_strategy.index[-1].date()}")
+        print(f"\n✅ Strategy built! Generated {len(arima_strategy)} trading signals")
+        print(f"⏱️ Time taken: {minutes}m {seconds:.1f}s")
+        print(f"Period: {arima_strategy.index[0].date()} to {arima_strategy.index[-1].date()}")
 
-    # Show a sample of predictions
-    print("\nSample predictions:")
-    print("=" * 60)
-    print(arima_strategy[['actual_price', 'predicted_price', 'signal']].head(10).round(2))
+        # Show a sample of predictions
+        print("\nSample predictions:")
+        print("=" * 60)
+        print(arima_strategy[['actual_price', 'predicted_price', 'signal']].head(10).round(2))
 
-    print(f"\n✅ ARIMA strategy complete!")
+        print(f"\n✅ ARIMA strategy complete!")
 
 
-    # Compute ARIMA strategy returns
-    arima_strategy['predicted_change'] = arima_strategy['predicted_price'] - arima_strategy['predicted_price'].shift(1)
-    arima_strategy['actual_change'] = arima_strategy['actual_price'] - arima_strategy['actual_price'].shift(1)
+        # Compute ARIMA strategy returns
+        arima_strategy['predicted_change'] = arima_strategy['predicted_price'] - arima_strategy['predicted_price'].shift(1)
+        arima_strategy['actual_change'] = arima_strategy['actual_price'] - arima_strategy['actual_price'].shift(1)
 
-    # Generate signals based on predicted change
-    arima_strategy['signal'] = arima_strategy['predicted_change'].apply(lambda x: 1 if x > 0 else -1)
+        # Generate signals based on predicted change
+        arima_strategy['signal'] = arima_strategy['predicted_change'].apply(lambda x: 1 if x > 0 else -1)
 
-    # Compute actual return (price change as % of previous price)
-    arima_strategy['actual_returns'] = arima_strategy['actual_price'].pct_change()
+        # Compute actual return (price change as % of previous price)
+        arima_strategy['actual_returns'] = arima_strategy['actual_price'].pct_change()
 
-    # Strategy return = signal × actual return
-    arima_strategy['strategy_returns'] = arima_strategy['signal'].shift(1) * arima_strategy['actual_returns']
+        # Strategy return = signal × actual return
+        arima_strategy['strategy_returns'] = arima_strategy['signal'].shift(1) * arima_strategy['actual_returns']
 
 
-    comparison = compare_strategies(arima_strategy, firm_name)
\ No newline at end of file
+        comparison = compare_strategies(arima_strategy, firm_name)
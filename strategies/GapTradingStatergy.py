@@ -1,14 +1,17 @@
-import yfinance as yf
+import numpy as np
 import pandas as pd
 from data.Index import fetch_nifty50_list
+from utils.helper import download_intraday
 
 # List of Nifty 50 stock symbols
 
+# (stop loss, target) as multiples of the entry price for each side
+EXIT_LEVELS = {'Long': (0.98, 1.04), 'Short': (1.01, 0.98)}
 
-# Function to fetch data from Yahoo Finance
-def fetch_data(symbol, start_date, end_date):
-    data = yf.download(symbol, start=start_date, end=end_date, interval='5m')
-    data.columns = [col[0].replace(r'/.+$', '') if isinstance(col, tuple) else col for col in data.columns]
+
+# Function to fetch 5-minute bars, reading stored sessions from the intraday store first
+def fetch_data(symbol, start_date, end_date, interval='5m'):
+    data = download_intraday(symbol, start_date, end_date, interval=interval)
 
     if not data.empty:
         data['Symbol'] = symbol
@@ -17,72 +20,113 @@ def fetch_data(symbol, start_date, end_date):
         return pd.DataFrame()  # Return empty DataFrame if no data
 
 
-def determine_gaps(data):
-
-    # Get the first opening price of each day for each stock
-    first_open = data.groupby(['Symbol', 'Date'])['Open'].first()
+def gap_table(data):
+    """
+    Opening gap of every symbol-day in the 5-minute panel, built in a single pass.
+    Returns First Open, Prev Close and Gap (%) indexed by (Date, Symbol).
+    """
+    # Get the first opening price and last closing price of each day for each stock
+    sessions = data.groupby(['Symbol', 'Date']).agg(**{'First Open': ('Open', 'first'),
+                                                      'Last Close': ('Close', 'last')})
 
-    # Get the last closing price of the previous day for each stock
-    last_close_prev_day = data.groupby(['Symbol', 'Date']).last()['Close'].groupby(level=0).shift(1)
-
-    # Create a DataFrame for stock-symbol-wise first open and last close
-    gap_data = pd.DataFrame({'First Open': first_open, 'Prev Close': last_close_prev_day}).dropna()
+    # Sessions are sorted by date within each symbol, so the previous row is the previous session
+    sessions['Prev Close'] = sessions.groupby(level='Symbol')['Last Close'].shift(1)
+    gap_data = sessions[['First Open', 'Prev Close']].dropna()
 
     # Calculate the percentage gap for the first candle of each day
     gap_data['Gap'] = (gap_data['First Open'] - gap_data['Prev Close']) / gap_data['Prev Close'] * 100
 
+    gap_data = gap_data.swaplevel().sort_index()
+    # dropna leaves each symbol's first session in the index levels; drop the unused labels
+    gap_data.index = gap_data.index.remove_unused_levels()
+    return gap_data
+
+
+def determine_gaps(gaps, date, top_n=3):
+    """Top gap ups and gap downs of one day from a gap_table, indexed by Symbol."""
+    if date not in gaps.index.get_level_values('Date'):
+        empty = gaps.iloc[:0].droplevel('Date')
+        return empty, empty
+
+    gap_data = gaps.xs(date, level='Date')
+
     # Separate into positive and negative gaps
     positive_gaps = gap_data[gap_data['Gap'] > 0]
     negative_gaps = gap_data[gap_data['Gap'] < 0]
 
-    # Get top 3 positive gaps (gap ups) and top 3 negative gaps (gap downs) globally
-    gap_ups = positive_gaps.nlargest(3, 'Gap')
-    gap_downs = negative_gaps.nsmallest(3, 'Gap')
+    # Get top N positive gaps (gap ups) and top N negative gaps (gap downs) across the day's stocks
+    gap_ups = positive_gaps.nlargest(top_n, 'Gap')
+    gap_downs = negative_gaps.nsmallest(top_n, 'Gap')
 
     return gap_ups, gap_downs
 
-# Backtest strategy
-def backtest_strategy(data, capital):
-    results = []
-    for date, group in data.groupby('Date'):
-        gap_ups, gap_downs = determine_gaps(group)
-        long_stocks = gap_ups['Symbol'].unique()
-        short_stocks = gap_downs['Symbol'].unique()
-
-        # Conduct trades for gap ups
-        for stock in long_stocks:
-            stock_data = group[group['Symbol'] == stock]
-            entry_price = stock_data.iloc[0]['Open']
-            stop_loss = entry_price * 0.98
-            target = entry_price * 1.04
-            for _, row in stock_data.iterrows():
-                if row['Low'] <= stop_loss:
-                    results.append((date, stock, 'Long', entry_price, stop_loss, 'Stopped out'))
-                    break
-                elif row['High'] >= target:
-                    results.append((date, stock, 'Long', entry_price, target, 'Target reached'))
-                    break
-                elif row.name == stock_data.index[-1]:
-                    results.append((date, stock, 'Long', entry_price, row['Close'], 'End of day'))
-
-        # Conduct trades for gap downs
-        for stock in short_stocks:
-            stock_data = group[group['Symbol'] == stock]
-            entry_price = stock_data.iloc[0]['Open']
-            stop_loss = entry_price * 1.01
-            target = entry_price * 0.98
-            for _, row in stock_data.iterrows():
-                if row['High'] >= stop_loss:
-                    results.append((date, stock, 'Short', entry_price, stop_loss, 'Stopped out'))
-                    break
-                elif row['Low'] <= target:
-                    results.append((date, stock, 'Short', entry_price, target, 'Target reached'))
-                    break
-                elif row.name == stock_data.index[-1]:
-                    results.append((date, stock, 'Short', entry_price, row['Close'], 'End of day'))
+def simulate_exits(data, trades):
+    """
+    Resolve the intraday exit of every trade at once.
+    trades has one row per trade with Date, Symbol and Position ('Long' / 'Short').
+    Entry is the session's first Open; the exit is the first 5-minute bar that touches the
+    stop (checked first) or the target, otherwise the last bar's Close.
+    Returns (date, stock, position, entry_price, exit_price, result) tuples in trade order.
+    """
+    if trades.empty:
+        return []
+
+    trades = trades.reset_index(drop=True)
+    trades['trade_id'] = np.arange(len(trades))
+    bars = data.reset_index(drop=True)
+    bars['row'] = np.arange(len(bars))
+    bars = trades.merge(bars, on=['Date', 'Symbol']).sort_values(['trade_id', 'row'])
+
+    # Bars of one trade are contiguous, so per-trade reductions can use reduceat on the group starts
+    trade_id = bars['trade_id'].values
+    starts = np.flatnonzero(np.r_[True, trade_id[1:] != trade_id[:-1]])
+    counts = np.diff(np.r_[starts, len(bars)])
+    bar_no = np.arange(len(bars)) - np.repeat(starts, counts)
+
+    traded = trades.loc[trade_id[starts]]
+    is_long = (traded['Position'] == 'Long').values
+    entry_price = bars['Open'].values[starts]
+    stop_loss = entry_price * np.where(is_long, EXIT_LEVELS['Long'][0], EXIT_LEVELS['Short'][0])
+    target = entry_price * np.where(is_long, EXIT_LEVELS['Long'][1], EXIT_LEVELS['Short'][1])
+
+    long_bar = np.repeat(is_long, counts)
+    high, low = bars['High'].values, bars['Low'].values
+    stop_hit = np.where(long_bar, low <= np.repeat(stop_loss, counts), high >= np.repeat(stop_loss, counts))
+    target_hit = np.where(long_bar, high >= np.repeat(target, counts), low <= np.repeat(target, counts))
+
+    never = len(bars)
+    first_stop = np.minimum.reduceat(np.where(stop_hit, bar_no, never), starts)
+    first_target = np.minimum.reduceat(np.where(target_hit, bar_no, never), starts)
+    last_close = bars['Close'].values[starts + counts - 1]
 
+    results = []
+    for k, (date, stock, position) in enumerate(traded[['Date', 'Symbol', 'Position']].itertuples(index=False)):
+        if first_stop[k] < never and first_stop[k] <= first_target[k]:
+            results.append((date, stock, position, entry_price[k], stop_loss[k], 'Stopped out'))
+        elif first_target[k] < never:
+            results.append((date, stock, position, entry_price[k], target[k], 'Target reached'))
+        else:
+            results.append((date, stock, position, entry_price[k], last_close[k], 'End of day'))
     return results
 
+
+# Backtest strategy
+def backtest_strategy(data, capital, top_n=3):
+    # Gaps for the whole panel are computed once; each day is then a lookup
+    gaps = gap_table(data)
+    trades = []
+    for date in gaps.index.unique(level='Date'):
+        gap_ups, gap_downs = determine_gaps(gaps, date, top_n)
+        long_stocks = gap_ups.index
+        short_stocks = gap_downs.index
+
+        # Conduct trades for gap ups and gap downs
+        trades += [(date, stock, 'Long') for stock in long_stocks]
+        trades += [(date, stock, 'Short') for stock in short_stocks]
+
+    # Resolve every trade's exit in one vectorized pass over the 5-minute bars
+    return simulate_exits(data, pd.DataFrame(trades, columns=['Date', 'Symbol', 'Position']))
+
 def main():
     # Fetch data for each symbol
     all_data = []
@@ -92,7 +136,6 @@ def main():
         print(f"Fetching data for {symbol}...")
         stock_data = fetch_data(symbol, '2025-02-01', '2025-02-28')
         if not stock_data.empty:
-            stock_data['Date'] = stock_data.index.date
             all_data.append(stock_data)
 
     # Combine all data into a single DataFrame
@@ -1,7 +1,6 @@
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -9,14 +8,27 @@ from typing import Dict, List, Tuple, Optional
 import requests
 from bs4 import BeautifulSoup
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from data.Index import  fetch_nifty5_list
 from data.Sectors import sector_mapping
-from utils.helper import get_piotroski_score
+from utils.helper import get_piotroski_score, get_fundamentals_cache
+from utils.fundamentals import FundamentalsCache
+from utils.rate_limit import HostRateLimiter
 
 
 class PEADStrategy:
-    def __init__(self):
+    def __init__(self, fundamentals=None, max_workers=1, host_rates=None, disk=None, cache_dir=None):
+        # Shared per-run cache so each statement is fetched once per ticker;
+        # disk=True uses the shared on-disk tier, cache_dir gives this strategy its own
+        if fundamentals is None and cache_dir is not None:
+            fundamentals = FundamentalsCache(disk_dir=cache_dir)
+        self.fundamentals = fundamentals or get_fundamentals_cache(disk=disk)
+
+        # Concurrent scans share one per-host rate limit across all worker threads. It is
+        # passed into every lookup rather than set on the cache, which may be shared process-wide
+        self.max_workers = max_workers
+        self.rate_limiter = HostRateLimiter(host_rates)
         self.today = datetime.now()
         self.two_days_ago = self.today - timedelta(days=2)
         self.seven_days_ago = self.today - timedelta(days=7)
@@ -56,6 +68,7 @@ class PEADStrategy:
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
             
+            self.rate_limiter.acquire(url)
             response = requests.get(url, headers=headers, timeout=10)
             if response.status_code != 200:
                 return None
@@ -108,6 +121,7 @@ class PEADStrategy:
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
             
+            self.rate_limiter.acquire(url)
             response = requests.get(url, headers=headers, timeout=10)
             if response.status_code != 200:
                 return None
@@ -125,15 +139,14 @@ class PEADStrategy:
         Get earnings announcements for the last 90 days (very flexible)
         """
         try:
-            stock = yf.Ticker(ticker)
-            earnings = stock.earnings_dates
+            earnings = self.fundamentals.get(ticker, 'earnings_dates', self.rate_limiter)
             
             if earnings is None or earnings.empty:
                 return None
             
-            # Convert timezone-aware dates to timezone-naive for comparison
+            # Convert timezone-aware dates to timezone-naive for comparison (without touching the cached frame)
             if earnings.index.tz is not None:
-                earnings.index = earnings.index.tz_localize(None)
+                earnings = earnings.tz_localize(None)
                 
             # Filter for announcements in the last 90 days (very flexible)
             ninety_days_ago = self.today - timedelta(days=90)
@@ -194,21 +207,19 @@ class PEADStrategy:
         Get analyst expectations for EPS
         """
         try:
-            stock = yf.Ticker(ticker)
-            
             # Try different methods to get earnings estimates
             earnings_estimates = None
             
             # Method 1: Try earnings_forecast
             try:
-                earnings_estimates = stock.earnings_forecast
+                earnings_estimates = self.fundamentals.get(ticker, 'earnings_forecast', self.rate_limiter)
             except AttributeError:
                 pass
             
             # Method 2: Try earnings_dates which might have estimates
             if earnings_estimates is None or earnings_estimates.empty:
                 try:
-                    earnings_dates = stock.earnings_dates
+                    earnings_dates = self.fundamentals.get(ticker, 'earnings_dates', self.rate_limiter)
                     if earnings_dates is not None and not earnings_dates.empty:
                         # Check if earnings_dates has estimate columns
                         if 'EPS Estimate' in earnings_dates.columns:
@@ -240,8 +251,7 @@ class PEADStrategy:
         Calculate average EPS of last 4 quarters
         """
         try:
-            stock = yf.Ticker(ticker)
-            earnings = stock.earnings
+            earnings = self.fundamentals.get(ticker, 'earnings', self.rate_limiter)
             
             if earnings is None or earnings.empty or len(earnings) < 4:
                 return None
@@ -261,11 +271,9 @@ class PEADStrategy:
         Get YoY changes in Sales, EBITDA, Net Profit
         """
         try:
-            stock = yf.Ticker(ticker)
-            
             # Get financial statements
-            income_stmt = stock.financials
-            balance_sheet = stock.balance_sheet
+            income_stmt = self.fundamentals.get(ticker, 'financials', self.rate_limiter)
+            balance_sheet = self.fundamentals.get(ticker, 'balance_sheet', self.rate_limiter)
             
             if income_stmt is None or income_stmt.empty:
                 return None
@@ -398,10 +406,8 @@ class PEADStrategy:
         indicators = []
         
         try:
-            stock = yf.Ticker(ticker)
-            
             # Check for dividend increases
-            dividends = stock.dividends
+            dividends = self.fundamentals.get(ticker, 'dividends', self.rate_limiter)
             if dividends is not None and not dividends.empty:
                 recent_dividends = dividends.tail(4)
                 if len(recent_dividends) >= 2:
@@ -409,7 +415,7 @@ class PEADStrategy:
                         indicators.append("Dividend increased")
             
             # Check for share buybacks (if available in balance sheet)
-            balance_sheet = stock.balance_sheet
+            balance_sheet = self.fundamentals.get(ticker, 'balance_sheet', self.rate_limiter)
             if balance_sheet is not None and not balance_sheet.empty:
                 if 'Treasury Stock' in balance_sheet.index:
                     current_treasury = balance_sheet.loc['Treasury Stock', balance_sheet.columns[0]]
@@ -418,7 +424,7 @@ class PEADStrategy:
                         indicators.append("Share buyback activity")
             
             # Check Piotroski score
-            piotroski_score = get_piotroski_score(ticker)
+            piotroski_score = get_piotroski_score(ticker, self.fundamentals, self.rate_limiter)
             if piotroski_score is not None:
                 if piotroski_score >= 7:
                     indicators.append(f"Strong Piotroski score: {piotroski_score}/9")
@@ -527,10 +533,20 @@ class PEADStrategy:
             print(f"Error analyzing {ticker}: {e}")
             return None
     
-    def run_strategy(self) -> List[Dict]:
+    def _analyze_ticker(self, ticker: str) -> Optional[Dict]:
+        try:
+            return self.analyze_stock(ticker)
+        except Exception as e:
+            print(f"Error processing {ticker}: {e}")
+            return None
+    
+    def run_strategy(self, max_workers: Optional[int] = None) -> List[Dict]:
         """
-        Run the complete PEAD strategy
+        Run the complete PEAD strategy.
+        With max_workers > 1 tickers are analyzed concurrently in a thread pool;
+        results keep the ticker list order either way.
         """
+        max_workers = max_workers or self.max_workers
         print("Running PEAD Strategy with Multiple Data Sources...")
         print(f"Looking for earnings announcements from {self.ninety_days_ago.strftime('%Y-%m-%d')} to {self.today.strftime('%Y-%m-%d')}")
         print(f"Data sources: Manual > Screener.in > MoneyControl > Yahoo Finance")
@@ -543,19 +559,21 @@ class PEADStrategy:
         buy_recommendations = []
         sell_recommendations = []
         
-        for ticker in tickers:
-            try:
-                analysis = self.analyze_stock(ticker)
-                if analysis:
-                    results.append(analysis)
-                    
-                    if analysis['recommendation'] == 'BUY':
-                        buy_recommendations.append(analysis)
-                    elif analysis['recommendation'] == 'SELL':
-                        sell_recommendations.append(analysis)
-                        
-            except Exception as e:
-                print(f"Error processing {ticker}: {e}")
+        if max_workers > 1:
+            # The work is blocking HTTP, so threads overlap it; map() yields in ticker order
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                analyses = list(executor.map(self._analyze_ticker, tickers))
+        else:
+            analyses = [self._analyze_ticker(ticker) for ticker in tickers]
+        
+        for analysis in analyses:
+            if analysis:
+                results.append(analysis)
+                
+                if analysis['recommendation'] == 'BUY':
+                    buy_recommendations.append(analysis)
+                elif analysis['recommendation'] == 'SELL':
+                    sell_recommendations.append(analysis)
         
         # Print results
         self.print_results(results, buy_recommendations, sell_recommendations)
@@ -624,7 +642,7 @@ def main():
     """
     Main function to run the PEAD strategy
     """
-    strategy = PEADStrategy()
+    strategy = PEADStrategy(max_workers=8)
     results = strategy.run_strategy()
     
     # Save results to CSV
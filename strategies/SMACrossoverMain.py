@@ -1,5 +1,8 @@
-from backtests.SMABacktester import SMABacktester
-from data.Index import fetch_nifty50_list
+import pandas as pd
+
+from backtests.SMABacktester import SMABacktester, panel_backtest
+from data.Index import fetch_nifty50_list, fetch_nifty500_list
+from utils.helper import download_batch
 
 def main():
     # Get a list of Nifty 500 tickers (these are just examples; you'll need to get the full list)
@@ -20,6 +23,18 @@ def main():
             print(f"Error processing {ticker}: {str(e)}")
 
 
+def main_panel(SMA_S=50, SMA_L=100, start="2021-01-01", end="2025-01-01"):
+    # Backtest the whole Nifty 500 in one vectorized pass over an aligned (dates x symbols) price array
+    tickers = fetch_nifty500_list()
+    panel = download_batch(tickers, interval='1d', start=start, end=end)
+    prices = pd.DataFrame({ticker: data["Close"] for ticker, data in panel.items() if not data.empty})
+    print(f" Testing {SMA_S}/{SMA_L} sma crossover strategy on {prices.shape[1]} symbols")
+
+    performance = panel_backtest(prices, SMA_S, SMA_L).sort_values("outperformance", ascending=False)
+    print(performance.to_string())
+    return performance
+
+
 if __name__ == "__main__":
 
     main()
\ No newline at end of file
@@ -1,8 +1,20 @@
-import yfinance as yf
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
+import matplotlib
 import matplotlib.pyplot as plt
 import mplfinance as mpf
 
+from utils.helper import download_data
+
+# Rendered trade charts go to <repo>/trade_charts (git-ignored) wherever the script is run from
+DEFAULT_CHART_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'trade_charts')
+
 # Parameters
 nifty_50_symbols = [
     "ABB.NS", "ACC.NS", "ADANIGREEN.NS", "ADANIPORTS.NS", "AMBUJACEM.NS",
@@ -34,16 +46,72 @@ def calculate_sma(data, window):
     return data['Close'].rolling(window=window).mean()
 
 
+def first_passage(close, starts, upper, lower):
+    """
+    For every query k, find the first bar j >= starts[k] where close[j] >= upper[k]
+    and the first where close[j] <= lower[k]; len(close) means it never happens.
+
+    Uses sparse tables of running max/min over power-of-two blocks and a binary-lifting
+    descent that runs for all queries at once, so each query costs O(log n).
+    """
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    maxes, mins = [close], [close]
+    step = 1
+    while 2 * step <= n:
+        maxes.append(np.maximum(maxes[-1][:-step], maxes[-1][step:]))
+        mins.append(np.minimum(mins[-1][:-step], mins[-1][step:]))
+        step *= 2
+
+    def descend(tables, not_hit):
+        pos = np.asarray(starts, dtype=int).copy()
+        for level in range(len(tables) - 1, -1, -1):
+            step = 1 << level
+            table = tables[level]
+            can_jump = pos + step <= n
+            block = table[np.minimum(pos, len(table) - 1)]
+            # Skip the whole block when no bar in it reaches the level
+            pos = np.where(can_jump & not_hit(block), pos + step, pos)
+        return pos
+
+    hit_upper = descend(maxes, lambda block: block < np.asarray(upper))
+    hit_lower = descend(mins, lambda block: block > np.asarray(lower))
+    return hit_upper, hit_lower
+
+
+def entry_signals(df):
+    """
+    Evaluate the entry rules on every bar at once.
+    A bar qualifies when SMA_150, SMA_30 and SMA_15 are all rising, its Low touches SMA_15
+    and it closes green. Returns the entry mask plus entry_price, stop_loss, risk,
+    position_size and target_price as columns (meaningful only where the mask is True).
+    """
+    rising = ((df['SMA_150'].diff() > 0) & (df['SMA_30'].diff() > 0) & (df['SMA_15'].diff() > 0))
+    low_below_sma15 = df['Low'] <= df['SMA_15']
+    green_candle = df['Close'] > df['Open']
+
+    signals = pd.DataFrame(index=df.index)
+    signals['entry'] = rising & low_below_sma15 & green_candle
+    # The first bars cannot look back two lows for the stop
+    signals.iloc[:3, signals.columns.get_loc('entry')] = False
+
+    signals['entry_price'] = df['High']
+    signals['stop_loss'] = np.minimum(df['Low'].shift(1), df['Low'].shift(2))
+    signals['risk'] = signals['entry_price'] - signals['stop_loss']
+    signals['position_size'] = (capital * risk_percentage) / signals['risk']
+    signals['target_price'] = signals['entry_price'] + signals['risk'] * risk_to_reward
+    return signals
+
+
 # Fetch historical data
 def fetch_historical_data(symbol):
     print(f"Fetching historical data for {symbol}...")
-    df = yf.download(symbol, start="2022-01-01", end="2025-01-01", progress=False)
+    df = download_data(symbol, interval='1d', start="2022-01-01", end="2025-01-01").copy()
     print(f"Data fetched for {symbol}, total records: {len(df)}")
-    df.columns = [col[0].replace(r'/.+$', '') if isinstance(col, tuple) else col for col in df.columns]
     print(df.columns)
     return df
 
-def plot_trade(df, symbol, entry_date, exit_date):
+def plot_trade(df, symbol, entry_date, exit_date, savefig=None):
     # Extract the data within the trade period for plotting
     plot_data = df.loc[entry_date:exit_date]
 
@@ -58,7 +126,8 @@ def plot_trade(df, symbol, entry_date, exit_date):
     # Additional moving averages can be passed in as a dictionary
     moving_avgs = {'MA15': ma15, 'MA30': ma30, 'MA150': ma150}
 
-    # Plot using mplfinance
+    # Plot using mplfinance (written to `savefig` instead of shown when a path is given)
+    plot_kwargs = {'savefig': dict(fname=savefig, dpi=100), 'closefig': True} if savefig else {}
     mpf.plot(
         plot_data,
         type='candle',
@@ -68,13 +137,62 @@ def plot_trade(df, symbol, entry_date, exit_date):
             mpf.make_addplot(ma15.loc[entry_date:exit_date], color='blue', width=1.0),
             mpf.make_addplot(ma30.loc[entry_date:exit_date], color='orange', width=1.0),
             mpf.make_addplot(ma150.loc[entry_date:exit_date], color='green', width=1.0)
-        ]
+        ],
+        **plot_kwargs
     )
 
+
+def _render_trade_chart(job):
+    """Worker entry point: render one queued trade chart to PNG with the headless Agg backend."""
+    matplotlib.use('Agg')
+    df, symbol, entry_date, exit_date, path = job
+    plot_trade(df, symbol, entry_date, exit_date, savefig=path)
+    return path
+
+
+class TradeChartQueue:
+    """
+    Collects trade chart jobs during a backtest and renders them afterwards,
+    off-screen and in a process pool, as PNG files in `output_dir`.
+    """
+
+    def __init__(self, output_dir=DEFAULT_CHART_DIR, workers=None):
+        self.output_dir = output_dir
+        self.workers = workers
+        self.jobs = []
+
+    def add(self, df, symbol, entry_date, exit_date):
+        # Keep only the trade window so each job stays small to send to a worker
+        trade_data = df.loc[entry_date:exit_date, ['Open', 'High', 'Low', 'Close', 'Volume',
+                                                   'SMA_15', 'SMA_30', 'SMA_150']].copy()
+        filename = f"{symbol}_{pd.Timestamp(entry_date):%Y%m%d}_{pd.Timestamp(exit_date):%Y%m%d}.png"
+        self.jobs.append((trade_data, symbol, entry_date, exit_date, os.path.join(self.output_dir, filename)))
+
+    def render(self):
+        """Render every queued chart and return the written file paths."""
+        if not self.jobs:
+            return []
+        os.makedirs(self.output_dir, exist_ok=True)
+        print(f"Rendering {len(self.jobs)} trade charts to {self.output_dir}...")
+
+        if self.workers == 1:
+            paths = [_render_trade_chart(job) for job in self.jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers,
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                paths = list(executor.map(_render_trade_chart, self.jobs, chunksize=8))
+        self.jobs = []
+        return paths
+
 # Main function to test strategy
-def test_strategy():
+def test_strategy(plot_charts=True, chart_dir=DEFAULT_CHART_DIR, chart_workers=None):
+    """
+    Run the strategy over nifty_50_symbols. Trade charts are queued and rendered to PNGs in
+    `chart_dir` after the backtest finishes; plot_charts=False skips charting entirely.
+    """
     trades = []
-    for symbol in nifty_50_symbols[:3]:
+    chart_queue = TradeChartQueue(chart_dir, chart_workers) if plot_charts else None
+    for symbol in nifty_50_symbols:
         print(f"\nTesting strategy for {symbol}...")
         try:
             df = fetch_historical_data(symbol)
@@ -85,52 +203,41 @@ def test_strategy():
 
             df.dropna(inplace=True)
 
-            for i in range(3, len(df)):
-                # Check if conditions were met for a potential entry
-                condition_150 = df['SMA_150'].iloc[i] > df['SMA_150'].iloc[i - 1]
-                condition_30 = df['SMA_30'].iloc[i] > df['SMA_30'].iloc[i - 1]
-                condition_15 = df['SMA_15'].iloc[i] > df['SMA_15'].iloc[i - 1]
-
-                if condition_150 and condition_30 and condition_15:
-
-                    # Execute a detailed comparison
-                    low_below_sma15 = (df['Low'].iloc[i] <= df['SMA_15'].iloc[i])
-                    green_candle = (df['Close'].iloc[i] > df['Open'].iloc[i])
-
-                    if low_below_sma15 and green_candle:
-                        print(f"Entry criteria met on {df.index[i]} for {symbol}")
-                        entry_price = df['High'].iloc[i]
-                        stop_loss = min(df['Low'].iloc[i - 1], df['Low'].iloc[i - 2])
-                        risk = entry_price - stop_loss
-                        if risk <= 0:
-                            print("Invalid risk calculation, possible issue in price data.")
-                            continue
-                        position_size = (capital * risk_percentage) / risk
-
-                        target_price = entry_price + (entry_price - stop_loss) * risk_to_reward
-
-                        entry_date = df.index[i]
-                        exit_date = None
-                        profit = None
-
-                        # Look ahead to find exit based on target or stop loss
-                        for j in range(i + 1, len(df)):
-                            current_price = df['Close'].iloc[j]
-                            if current_price >= target_price:
-                                profit = (target_price - entry_price) * position_size
-                                exit_date = df.index[j]
-                                trades.append((symbol, entry_date, exit_date, "Profit", profit))
-                                print(f"Target hit for {symbol} on {exit_date}, Profit: {profit}")
-                                plot_trade(df, symbol, entry_date, exit_date)
-
-                                break
-                            elif current_price <= stop_loss:
-                                loss = (entry_price - stop_loss) * position_size
-                                exit_date = df.index[j]
-                                trades.append((symbol, entry_date, exit_date, "Loss", loss))
-                                print(f"Stop loss hit for {symbol} on {exit_date}, Loss: {loss}")
-                                plot_trade(df, symbol, entry_date, exit_date)
-                                break
+            # Check entry conditions on all bars at once
+            signals = entry_signals(df)
+            for entry_date in signals.index[signals['entry']]:
+                print(f"Entry criteria met on {entry_date} for {symbol}")
+            invalid_risk = signals['entry'] & (signals['risk'] <= 0)
+            if invalid_risk.any():
+                print(f"Invalid risk calculation on {invalid_risk.sum()} bars, possible issue in price data.")
+
+            entry_idx = np.flatnonzero(signals['entry'] & (signals['risk'] > 0))
+            if len(entry_idx) == 0:
+                continue
+            entry_prices = signals['entry_price'].values[entry_idx]
+            stop_losses = signals['stop_loss'].values[entry_idx]
+            position_sizes = signals['position_size'].values[entry_idx]
+            target_prices = signals['target_price'].values[entry_idx]
+
+            # Look ahead to find exit based on target or stop loss, for all entries at once
+            hit_target, hit_stop = first_passage(df['Close'].values, entry_idx + 1, target_prices, stop_losses)
+
+            for k, i in enumerate(entry_idx):
+                entry_date = df.index[i]
+                if hit_target[k] < hit_stop[k]:
+                    profit = (target_prices[k] - entry_prices[k]) * position_sizes[k]
+                    exit_date = df.index[hit_target[k]]
+                    trades.append((symbol, entry_date, exit_date, "Profit", profit))
+                    print(f"Target hit for {symbol} on {exit_date}, Profit: {profit}")
+                    if chart_queue is not None:
+                        chart_queue.add(df, symbol, entry_date, exit_date)
+                elif hit_stop[k] < len(df):
+                    loss = (entry_prices[k] - stop_losses[k]) * position_sizes[k]
+                    exit_date = df.index[hit_stop[k]]
+                    trades.append((symbol, entry_date, exit_date, "Loss", loss))
+                    print(f"Stop loss hit for {symbol} on {exit_date}, Loss: {loss}")
+                    if chart_queue is not None:
+                        chart_queue.add(df, symbol, entry_date, exit_date)
 
         except Exception as e:
             print(f"Error processing {symbol}: {e}")
@@ -152,6 +259,9 @@ def test_strategy():
     print(f"Total Loss: {total_loss}")
     print(f"Overall Profit/Loss: {overall_result}")
 
+    if chart_queue is not None:
+        chart_queue.render()
+
 
 # Run the strategy
 def main():
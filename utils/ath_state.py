@@ -0,0 +1,75 @@
+import os
+import pandas as pd
+
+from utils.price_store import DEFAULT_STORE_DIR
+
+STATE_COLUMNS = ['ath_high', 'ath_date', 'last_date', 'last_close']
+
+
+class ATHState:
+    """
+    Persistent per-symbol all-time-high table.
+    For every symbol it keeps the running max High over completed bars with the
+    date it was set, plus the latest (possibly still forming) bar's date and close.
+    Only bars from the stored last_date onwards are needed to bring a symbol up to date.
+    """
+
+    def __init__(self, interval='1mo', root=None):
+        self.interval = interval
+        root = root or os.path.join(os.environ.get('ALGOS_PRICE_STORE', DEFAULT_STORE_DIR), 'ath_state')
+        self.path = os.path.join(root, f"{interval}.parquet")
+        if os.path.exists(self.path):
+            self.table = pd.read_parquet(self.path)
+        else:
+            self.table = pd.DataFrame(columns=STATE_COLUMNS, index=pd.Index([], name='symbol'))
+
+    def symbols(self):
+        return set(self.table.index)
+
+    def update(self, panel):
+        """
+        Fold new bars from a {symbol: DataFrame} panel into the table.
+        Each frame should start at or before the symbol's stored last_date, since that
+        bar may have been partial; the final bar of every frame becomes the new last bar.
+        """
+        frames = {}
+        for symbol, data in panel.items():
+            if data is None or data.empty:
+                continue
+            if data.index.tz is not None:
+                data = data.tz_localize(None)
+            if symbol in self.table.index:
+                data = data[data.index >= self.table.at[symbol, 'last_date']]
+            if not data.empty:
+                frames[symbol] = data[['High', 'Close']]
+        if not frames:
+            return self.table
+
+        bars = pd.concat(frames, names=['symbol', 'date']).reset_index()
+        is_last = ~bars['symbol'].duplicated(keep='last')
+        last = bars[is_last].set_index('symbol')
+
+        # Highest completed bar per symbol, earliest date on ties (same as idxmax)
+        completed = bars[~is_last].dropna(subset=['High'])
+        best = (completed.sort_values(['symbol', 'High', 'date'], ascending=[True, False, True])
+                .drop_duplicates('symbol').set_index('symbol'))
+
+        table = self.table.reindex(self.table.index.union(last.index))
+        table.index.name = 'symbol'
+        best = best.reindex(table.index)
+        ath_high = table['ath_high'].astype(float)
+        raises = best['High'].notna() & (ath_high.isna() | (best['High'] > ath_high))
+        table.loc[raises, 'ath_high'] = best.loc[raises, 'High']
+        table.loc[raises, 'ath_date'] = best.loc[raises, 'date']
+        table.loc[last.index, 'last_date'] = last['date']
+        table.loc[last.index, 'last_close'] = last['Close']
+
+        self.table = table.astype({'ath_high': float, 'last_close': float,
+                                   'ath_date': 'datetime64[ns]', 'last_date': 'datetime64[ns]'})
+        return self.table
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        self.table.to_parquet(tmp_path)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,167 @@
+import os
+import json
+import hashlib
+import inspect
+import functools
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.price_store import DEFAULT_STORE_DIR
+
+
+def _key_part(value):
+    """
+    Stable description of one argument for the cache key.
+    pandas and numpy values are hashed by content, containers recursively;
+    anything whose repr may not reflect its content raises TypeError.
+    """
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes,
+                                           datetime, timedelta, pd.Timestamp, pd.Timedelta, np.generic)):
+        return repr(value)
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        digest = hashlib.sha1(pd.util.hash_pandas_object(value, index=True).values.tobytes()).hexdigest()
+        labels = list(value.columns) if isinstance(value, pd.DataFrame) else [value.name]
+        return f"{type(value).__name__}({digest}, {labels!r}, {value.dtypes!r})"
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            return f"ndarray({value.shape}, [{', '.join(_key_part(v) for v in value.ravel())}])"
+        digest = hashlib.sha1(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return f"ndarray({value.dtype}, {value.shape}, {digest})"
+    if isinstance(value, (tuple, list)):
+        return f"{type(value).__name__}([{', '.join(_key_part(v) for v in value)}])"
+    if isinstance(value, (set, frozenset)):
+        return f"{type(value).__name__}([{', '.join(sorted(_key_part(v) for v in value))}])"
+    if isinstance(value, dict):
+        items = sorted((_key_part(k), _key_part(v)) for k, v in value.items())
+        return f"dict([{', '.join(f'{k}: {v}' for k, v in items)}])"
+    raise TypeError(f"disk_cache cannot build a key from a {type(value).__name__} argument")
+
+
+def disk_cache(ttl=timedelta(hours=12), maxsize=64, root=None, name=None):
+    """
+    Memoize a data-fetch function in memory and on disk.
+
+    Results are kept in an in-memory LRU of `maxsize` entries and, when they are
+    DataFrames or Series, persisted as Parquet under <root>/<name>/<key>.parquet so
+    later runs reuse them. Entries older than `ttl` (None = never expire) are refetched.
+    None results are never cached, so failed downloads are retried.
+
+    Keys come from the bound arguments with defaults applied, so f(x) and
+    f(x, y=<default>) share an entry. DataFrames, Series and arrays are keyed by
+    content; argument types without a reliable key raise TypeError.
+
+    The wrapper exposes cache_info() with hit/miss counts and cache_clear(disk=False),
+    mirroring functools.lru_cache.
+    """
+    def decorator(func):
+        cache_dir = os.path.join(root or os.path.join(os.environ.get('ALGOS_PRICE_STORE', DEFAULT_STORE_DIR), 'cache'),
+                                 name or f"{func.__module__}.{func.__qualname__}")
+        memory = OrderedDict()
+        stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'expired': 0}
+        lock = threading.Lock()
+        signature = inspect.signature(func)
+
+        def make_key(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return hashlib.sha1(_key_part(dict(bound.arguments)).encode()).hexdigest()
+
+        def is_expired(stored_at):
+            return ttl is not None and datetime.now() - stored_at > ttl
+
+        def load(key):
+            path = os.path.join(cache_dir, key + '.parquet')
+            meta_path = os.path.join(cache_dir, key + '.json')
+            if not os.path.exists(path) or not os.path.exists(meta_path):
+                return None, None
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            stored_at = datetime.fromisoformat(meta['stored_at'])
+            if is_expired(stored_at):
+                return None, stored_at
+            value = pd.read_parquet(path)
+            if meta.get('series'):
+                value = value.iloc[:, 0]
+                value.name = meta.get('series_name')
+            return value, stored_at
+
+        def save(key, value, stored_at):
+            os.makedirs(cache_dir, exist_ok=True)
+            frame = value.to_frame(name=str(value.name) if value.name is not None else '0') \
+                if isinstance(value, pd.Series) else value
+            # Write to a temp file first so an interrupted run never leaves a truncated entry
+            tmp_path = os.path.join(cache_dir, key + '.parquet.tmp')
+            frame.to_parquet(tmp_path)
+            os.replace(tmp_path, os.path.join(cache_dir, key + '.parquet'))
+            meta = {
+                'stored_at': stored_at.isoformat(),
+                'series': isinstance(value, pd.Series),
+                'series_name': value.name if isinstance(value, pd.Series) else None,
+            }
+            with open(os.path.join(cache_dir, key + '.json'), 'w') as f:
+                json.dump(meta, f)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+
+            expired = False
+            with lock:
+                if key in memory:
+                    value, stored_at = memory[key]
+                    if not is_expired(stored_at):
+                        memory.move_to_end(key)
+                        stats['hits'] += 1
+                        return value
+                    del memory[key]
+                    expired = True
+
+            value, stored_at = load(key)
+            if value is not None:
+                with lock:
+                    stats['disk_hits'] += 1
+            else:
+                with lock:
+                    stats['misses'] += 1
+                    if expired or stored_at is not None:
+                        stats['expired'] += 1
+                value = func(*args, **kwargs)
+                if value is None:
+                    return value
+                stored_at = datetime.now()
+                if isinstance(value, (pd.DataFrame, pd.Series)):
+                    try:
+                        save(key, value, stored_at)
+                    except Exception as e:
+                        print(f"Could not persist cache entry for {func.__qualname__}: {e}")
+
+            with lock:
+                memory[key] = (value, stored_at)
+                memory.move_to_end(key)
+                while maxsize is not None and len(memory) > maxsize:
+                    memory.popitem(last=False)
+            return value
+
+        def cache_info():
+            with lock:
+                return dict(stats, currsize=len(memory), maxsize=maxsize)
+
+        def cache_clear(disk=False):
+            with lock:
+                memory.clear()
+                for counter in stats:
+                    stats[counter] = 0
+            if disk and os.path.isdir(cache_dir):
+                for entry in os.listdir(cache_dir):
+                    os.remove(os.path.join(cache_dir, entry))
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        wrapper.cache_dir = cache_dir
+        return wrapper
+
+    return decorator
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+
+from utils.helper import download_batch, get_fundamentals_cache
+
+DEFAULT_HORIZONS = (1, 5, 20, 60)
+
+
+def earnings_events(tickers, fundamentals=None):
+    """
+    Build a (symbol, earnings_date, surprise) table from every reported quarter in
+    Yahoo's earnings_dates. Upcoming announcements without a surprise are dropped.
+    """
+    fundamentals = fundamentals or get_fundamentals_cache()
+    frames = []
+    for ticker in tickers:
+        try:
+            earnings = fundamentals.get(ticker, 'earnings_dates')
+        except Exception as e:
+            print(f"Error getting earnings for {ticker}: {e}")
+            continue
+        if earnings is None or earnings.empty or 'Surprise (%)' not in earnings.columns:
+            continue
+        dates = earnings.index.tz_localize(None) if earnings.index.tz is not None else earnings.index
+        frames.append(pd.DataFrame({'symbol': ticker, 'earnings_date': dates,
+                                    'surprise': earnings['Surprise (%)'].to_numpy()}))
+    if not frames:
+        return pd.DataFrame(columns=['symbol', 'earnings_date', 'surprise'])
+    return pd.concat(frames, ignore_index=True).dropna(subset=['surprise'])
+
+
+def pead_event_study(events, horizons=DEFAULT_HORIZONS, panel=None):
+    """
+    Post-earnings drift for many events at once.
+
+    events has symbol, earnings_date and surprise columns. Each event is anchored on
+    the first daily close on or after its announcement date (a merge_asof forward
+    match per symbol), and drift_<h> is the % change from that close to the close
+    h sessions later, NaN when the series does not reach that far yet.
+    Daily bars come from `panel` ({symbol: DataFrame}) or the local price store.
+    """
+    events = events.copy()
+    events['earnings_date'] = pd.to_datetime(events['earnings_date'])
+    if events['earnings_date'].dt.tz is not None:
+        events['earnings_date'] = events['earnings_date'].dt.tz_localize(None)
+    events['earnings_date'] = events['earnings_date'].dt.normalize()
+
+    if panel is None:
+        # Enough calendar days after the last event to cover the longest horizon
+        start = events['earnings_date'].min() - timedelta(days=7)
+        end = events['earnings_date'].max() + timedelta(days=2 * max(horizons) + 7)
+        panel = download_batch(events['symbol'].unique(), interval='1d', start=start,
+                               end=min(end, pd.Timestamp.now().normalize() + timedelta(days=1)))
+
+    frames = []
+    for symbol in events['symbol'].unique():
+        data = panel.get(symbol)
+        if data is None or data.empty:
+            continue
+        close = data['Close'].dropna()
+        index = close.index.tz_localize(None) if close.index.tz is not None else close.index
+        frames.append(pd.DataFrame({'symbol': symbol, 'date': index, 'close': close.to_numpy()}))
+
+    horizon_columns = [f'drift_{h}' for h in horizons]
+    if not frames:
+        return events.assign(anchor_date=pd.NaT, anchor_close=np.nan, **{c: np.nan for c in horizon_columns})
+
+    prices = pd.concat(frames, ignore_index=True)
+    # Global row number and the last row of each symbol, so horizons become array offsets
+    prices['row'] = np.arange(len(prices))
+    prices['last_row'] = prices.groupby('symbol')['row'].transform('max')
+
+    events['order'] = np.arange(len(events))
+    aligned = pd.merge_asof(events.sort_values('earnings_date'), prices.sort_values('date'),
+                            left_on='earnings_date', right_on='date', by='symbol', direction='forward')
+    aligned = aligned.sort_values('order').reset_index(drop=True)
+
+    closes = prices['close'].to_numpy()
+    anchored = aligned['row'].notna().to_numpy()
+    anchor_row = aligned['row'].fillna(0).to_numpy(dtype=int)
+    last_row = aligned['last_row'].fillna(-1).to_numpy(dtype=int)
+    anchor_close = np.where(anchored, closes[anchor_row], np.nan)
+
+    result = events.drop(columns='order').reset_index(drop=True)
+    result['anchor_date'] = aligned['date']
+    result['anchor_close'] = anchor_close
+    for h, column in zip(horizons, horizon_columns):
+        target_row = anchor_row + h
+        valid = anchored & (target_row <= last_row)
+        target_close = closes[np.where(valid, target_row, 0)]
+        result[column] = np.where(valid, (target_close - anchor_close) / anchor_close * 100, np.nan)
+    return result
+
+
+def summarize_drift(study, horizons=DEFAULT_HORIZONS):
+    """Average drift per horizon for positive and negative surprises."""
+    columns = [f'drift_{h}' for h in horizons]
+    side = np.where(study['surprise'] > 0, 'positive', np.where(study['surprise'] < 0, 'negative', 'inline'))
+    summary = study.groupby(side)[columns].mean()
+    summary['events'] = study.groupby(side).size()
+    return summary
@@ -0,0 +1,132 @@
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+import yfinance as yf
+
+from utils.price_store import DEFAULT_STORE_DIR
+from utils.rate_limit import YAHOO_HOST
+
+# yf.Ticker attributes served by the cache
+STATEMENTS = ('earnings_dates', 'earnings', 'earnings_forecast', 'financials',
+              'balance_sheet', 'cashflow', 'dividends')
+
+
+class FundamentalsCache:
+    """
+    Per-run cache of yf.Ticker fundamentals.
+    Every (ticker, statement) pair is fetched once through a single shared yf.Ticker
+    and the same frame is handed to every consumer, so callers must not modify it.
+    With `disk_dir` set, statements are also persisted as
+    <disk_dir>/<statement>/<ticker>/<report date>.parquet and the latest one is
+    reused by later runs until it is older than `max_age`.
+    An optional HostRateLimiter throttles the Yahoo requests made on cache misses;
+    callers sharing the cache can also pass their own limiter to get().
+    """
+
+    def __init__(self, disk_dir=None, max_age=timedelta(days=1), rate_limiter=None):
+        self.disk_dir = disk_dir
+        self.max_age = max_age
+        self.rate_limiter = rate_limiter
+        self._tickers = {}
+        self._frames = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def ticker(self, ticker):
+        """Shared yf.Ticker for a symbol."""
+        with self._lock:
+            if ticker not in self._tickers:
+                self._tickers[ticker] = yf.Ticker(ticker)
+            return self._tickers[ticker]
+
+    def get(self, ticker, statement, rate_limiter=None):
+        """
+        Return a yf.Ticker statement (e.g. 'financials'), fetching it at most once.
+        A fetch goes through `rate_limiter` when given, else the cache's own one.
+        Fetch errors propagate to the caller and are not cached.
+        """
+        rate_limiter = rate_limiter or self.rate_limiter
+        if statement not in STATEMENTS:
+            raise ValueError(f"Unsupported statement: {statement}")
+        key = (ticker, statement)
+        with self._lock:
+            if key in self._frames:
+                return self._frames[key]
+            key_lock = self._locks.setdefault(key, threading.Lock())
+
+        # Concurrent callers for the same statement wait for the first fetch instead of repeating it
+        with key_lock:
+            with self._lock:
+                if key in self._frames:
+                    return self._frames[key]
+            frame = self._read_disk(ticker, statement)
+            if frame is None:
+                if rate_limiter is not None:
+                    rate_limiter.acquire(YAHOO_HOST)
+                frame = getattr(self.ticker(ticker), statement)
+                self._write_disk(ticker, statement, frame)
+            with self._lock:
+                self._frames[key] = frame
+            return frame
+
+    def clear(self):
+        with self._lock:
+            self._tickers.clear()
+            self._frames.clear()
+            self._locks.clear()
+
+    def _statement_dir(self, ticker, statement):
+        safe_ticker = ticker.replace('/', '_').replace(os.sep, '_')
+        return os.path.join(self.disk_dir, statement, safe_ticker)
+
+    def _read_disk(self, ticker, statement):
+        if self.disk_dir is None:
+            return None
+        statement_dir = self._statement_dir(ticker, statement)
+        if not os.path.isdir(statement_dir):
+            return None
+        reports = sorted(name for name in os.listdir(statement_dir) if name.endswith('.parquet'))
+        if not reports:
+            return None
+        path = os.path.join(statement_dir, reports[-1])
+        if datetime.now() - datetime.fromtimestamp(os.path.getmtime(path)) > self.max_age:
+            return None
+
+        frame = pd.read_parquet(path)
+        if statement == 'dividends':
+            return frame.iloc[:, 0]
+        if statement in ('financials', 'balance_sheet', 'cashflow'):
+            frame.columns = pd.to_datetime(frame.columns)
+        return frame
+
+    def _write_disk(self, ticker, statement, frame):
+        if self.disk_dir is None or frame is None or len(frame) == 0:
+            return
+        if isinstance(frame, pd.Series):
+            frame = frame.to_frame()
+        frame = frame.copy()
+
+        # Statements are dated by column, earnings and dividends by row
+        if statement in ('financials', 'balance_sheet', 'cashflow'):
+            report_date = max(frame.columns)
+            frame.columns = [pd.Timestamp(col).isoformat() for col in frame.columns]
+        elif isinstance(frame.index, pd.DatetimeIndex):
+            report_date = frame.index.max()
+        else:
+            report_date = datetime.now()
+        frame.columns = [str(col) for col in frame.columns]
+
+        statement_dir = self._statement_dir(ticker, statement)
+        os.makedirs(statement_dir, exist_ok=True)
+        path = os.path.join(statement_dir, f"{pd.Timestamp(report_date).strftime('%Y-%m-%d')}.parquet")
+        try:
+            frame.to_parquet(path + '.tmp')
+            os.replace(path + '.tmp', path)
+        except Exception as e:
+            print(f"Could not persist {statement} for {ticker}: {e}")
+
+
+def default_fundamentals_dir():
+    return os.path.join(os.environ.get('ALGOS_PRICE_STORE', DEFAULT_STORE_DIR), 'fundamentals')
@@ -1,20 +1,284 @@
 import yfinance as yf
+import numpy as np
 import pandas as pd
-from datetime import timedelta
+from datetime import datetime, timedelta
 
-def download_data(ticker, interval='1mo', period='7y'):
-    data = yf.download(ticker, period=period, interval=interval , progress=False)
+from utils.price_store import PriceStore, IntradayStore, slice_range, exchange_time, SESSION_CLOSE
+from utils.fundamentals import FundamentalsCache, default_fundamentals_dir
+
+_price_store = None
+_intraday_store = None
+_fundamentals = None
+
+
+def get_price_store():
+    """Shared PriceStore used by download_data (created on first use)."""
+    global _price_store
+    if _price_store is None:
+        _price_store = PriceStore()
+    return _price_store
+
+
+def get_intraday_store():
+    """Shared IntradayStore used by download_intraday (created on first use)."""
+    global _intraday_store
+    if _intraday_store is None:
+        _intraday_store = IntradayStore()
+    return _intraday_store
+
+
+def get_fundamentals_cache(disk=None):
+    """
+    Shared FundamentalsCache for this run (created on first use).
+    disk=True backs it with the on-disk tier under the price store root. The default
+    (None) takes the existing cache as is, or creates a memory-only one; asking for
+    a different disk setting than the existing cache has raises ValueError.
+    """
+    global _fundamentals
+    if _fundamentals is None:
+        _fundamentals = FundamentalsCache(disk_dir=default_fundamentals_dir() if disk else None)
+    elif disk is not None and bool(disk) != (_fundamentals.disk_dir is not None):
+        raise ValueError(f"Shared fundamentals cache already exists with disk="
+                         f"{_fundamentals.disk_dir is not None}; pass a FundamentalsCache explicitly instead")
+    return _fundamentals
+
+
+def clean_columns(data):
     data.columns = [col[0].replace(r'/.+$', '') if isinstance(col, tuple) else col for col in data.columns]
     return data
 
-def get_piotroski_score(ticker):
+
+def period_to_start(period, now=None):
+    """Translate a yfinance period string ('7y', '6mo', '2wk', '5d', 'ytd', 'max') into a start date."""
+    now = pd.Timestamp(now or datetime.now()).normalize()
+    if period is None or period == 'max':
+        return None
+    if period == 'ytd':
+        return now.replace(month=1, day=1)
+    for suffix, offset in (('mo', 'months'), ('wk', 'weeks'), ('y', 'years'), ('d', 'days')):
+        if period.endswith(suffix):
+            return now - pd.DateOffset(**{offset: int(period[:-len(suffix)])})
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def fetch_data(ticker, interval='1d', start=None, end=None, period=None):
+    """Download bars straight from Yahoo Finance, bypassing the local store."""
+    if start is None and period is not None:
+        data = yf.download(ticker, period=period, interval=interval, progress=False)
+    else:
+        data = yf.download(ticker, start=start, end=end, interval=interval, progress=False)
+    return clean_columns(data)
+
+
+def download_data(ticker, interval='1mo', period='7y', start=None, end=None, use_store=True):
+    """
+    Load OHLCV bars for a ticker, reading the local price store first and
+    only downloading the part of the requested range that is not stored yet.
+    `start`/`end` take precedence over `period`; `end` is exclusive like yfinance.
+    """
+    if start is None:
+        start = period_to_start(period)
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+
+    if not use_store:
+        return fetch_data(ticker, interval, start=start, end=end, period=period)
+
+    store = get_price_store()
+    meta = store.read_meta(ticker, interval)
+    now = pd.Timestamp(datetime.now())
+    requested_end = min(end, now) if end is not None else now
+
+    if meta is None:
+        # Cold cache: fetch the whole range once
+        data = fetch_data(ticker, interval, start=start, end=end, period=period if start is None else None)
+        if data.empty:
+            return data
+        store.write(ticker, interval, data, start, requested_end)
+        return slice_range(data, start, end)
+
+    covered_start, covered_end = meta['covered_start'], meta['covered_end']
+    if covered_start is not None and (start is None or start < covered_start):
+        # Backfill only the older bars that are missing in front of the stored range
+        head = fetch_data(ticker, interval, start=start, end=covered_start,
+                          period=period if start is None else None)
+        covered_start = start
+        if not head.empty:
+            head = slice_range(head, None, meta['covered_start'])
+            store.merge(ticker, interval, head, covered_start, covered_end, meta['fetched_at'])
+        else:
+            stored = store.read(ticker, interval)
+            if stored is not None:
+                store.write(ticker, interval, stored, covered_start, covered_end, meta['fetched_at'])
+        meta = store.read_meta(ticker, interval)
+
+    if not store.is_fresh(meta, end):
+        # Top up the tail, re-fetching the last stored bar since it may have been partial
+        stored = store.read(ticker, interval)
+        tail_start = covered_end
+        if stored is not None and not stored.empty:
+            tail_start = min(tail_start, pd.Timestamp(stored.index[-1]).tz_localize(None))
+        tail = fetch_data(ticker, interval, start=tail_start, end=end)
+        covered_end = max(requested_end, covered_end)
+        if not tail.empty:
+            store.merge(ticker, interval, tail, covered_start, covered_end)
+        elif stored is not None:
+            store.write(ticker, interval, stored, covered_start, covered_end)
+
+    # The metadata can outlive a deleted Parquet file, in which case nothing is stored
+    data = slice_range(store.read(ticker, interval), start, end)
+    return data if data is not None else pd.DataFrame()
+
+
+def download_intraday(ticker, start, end, interval='5m', use_store=True):
+    """
+    Load intraday bars for [start, end) with a 'Date' session column.
+    Completed sessions are read from the intraday store and only the missing ones
+    are downloaded (in one request spanning them); a session still in progress is
+    fetched live and never persisted.
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if not use_store:
+        data = fetch_data(ticker, interval, start=start, end=end)
+        if not data.empty:
+            data['Date'] = data.index.date
+        return data
+
+    store = get_intraday_store()
+    missing = store.missing_sessions(ticker, interval, start, end)
+    if missing:
+        fetched = fetch_data(ticker, interval, start=missing[0], end=missing[-1] + timedelta(days=1))
+        store.write_sessions(ticker, interval, fetched, requested=missing)
+    data = store.read(ticker, interval, start, end)
+
+    now = exchange_time()
+    today = pd.Timestamp(now.date())
+    if start <= today < end and now.time() < SESSION_CLOSE:
+        live = fetch_data(ticker, interval, start=today, end=today + timedelta(days=1))
+        if not live.empty:
+            live['Date'] = live.index.date
+            data = pd.concat([data, live]) if not data.empty else live
+    return data
+
+
+def yahoo_batch_provider(symbols, interval='1d', start=None, end=None):
+    """Fetch several tickers in one yf.download request and split the result per symbol."""
+    if start is None:
+        raw = yf.download(list(symbols), period='max', end=end, interval=interval,
+                          group_by='ticker', threads=True, progress=False)
+    else:
+        raw = yf.download(list(symbols), start=start, end=end, interval=interval,
+                          group_by='ticker', threads=True, progress=False)
+    panel = {}
+    for symbol in symbols:
+        if isinstance(raw.columns, pd.MultiIndex) and symbol in raw.columns.get_level_values(0):
+            data = raw[symbol].copy()
+        elif isinstance(raw.columns, pd.MultiIndex) and symbol in raw.columns.get_level_values(1):
+            data = raw.xs(symbol, axis=1, level=1).copy()
+        else:
+            continue
+        # Multi-ticker frames share one date index, so drop the rows this symbol did not trade
+        panel[symbol] = data.dropna(how='all')
+    return panel
+
+
+def download_batch(symbols, interval='1mo', period='7y', start=None, end=None,
+                   chunk_size=100, provider=None, use_store=True):
+    """
+    Load bars for many tickers at once and return a {symbol: DataFrame} panel.
+    Symbols already fresh in the price store are read locally; the rest are
+    fetched `chunk_size` at a time through `provider(symbols, interval, start, end)`,
+    which defaults to yahoo_batch_provider. Symbols with no data map to an empty frame;
+    the store marks them so later calls skip them until the marker expires.
+    """
+    provider = provider or yahoo_batch_provider
+    if start is None:
+        start = period_to_start(period)
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    now = pd.Timestamp(datetime.now())
+    requested_end = min(end, now) if end is not None else now
+
+    store = get_price_store() if use_store else None
+    panel = {}
+    cold, stale = [], {}
+    for symbol in dict.fromkeys(symbols):
+        if store and store.is_marked_empty(symbol, interval):
+            # A recent download returned nothing for this symbol, so serve whatever is stored
+            stored = store.read(symbol, interval, start, end)
+            panel[symbol] = stored if stored is not None else pd.DataFrame()
+            continue
+        meta = store.read_meta(symbol, interval) if store else None
+        if meta is None or (meta['covered_start'] is not None and (start is None or start < meta['covered_start'])):
+            cold.append(symbol)
+        elif not store.is_fresh(meta, end):
+            stored = store.read(symbol, interval)
+            tail_start = meta['covered_end']
+            if stored is not None and not stored.empty:
+                tail_start = min(tail_start, pd.Timestamp(stored.index[-1]).tz_localize(None))
+            stale[symbol] = (tail_start, meta)
+        else:
+            stored = store.read(symbol, interval, start, end)
+            panel[symbol] = stored if stored is not None else pd.DataFrame()
+
+    # Cold symbols need the full range; stale ones only need the tail from the oldest stored end
+    jobs = [(cold, start)]
+    if stale:
+        jobs.append((list(stale), min(tail_start for tail_start, _ in stale.values())))
+
+    for group, fetch_start in jobs:
+        for i in range(0, len(group), chunk_size):
+            chunk = group[i:i + chunk_size]
+            print(f"Downloading {len(chunk)} symbols ({i + len(chunk)}/{len(group)})...")
+            try:
+                fetched = provider(chunk, interval=interval, start=fetch_start, end=end)
+                failed = False
+            except Exception as e:
+                print(f"Error downloading batch starting with {chunk[0]}: {e}")
+                fetched, failed = {}, True
+
+            for symbol in chunk:
+                data = fetched.get(symbol)
+                if data is not None and not data.empty:
+                    data = clean_columns(data)
+                if store is None:
+                    panel[symbol] = data if data is not None else pd.DataFrame()
+                    continue
+                if (data is None or data.empty) and not failed:
+                    # Delisted or unknown tickers would otherwise be requested again on every call
+                    store.mark_empty(symbol, interval)
+                if symbol in stale:
+                    meta = stale[symbol][1]
+                    covered_end = max(requested_end, meta['covered_end'])
+                    if data is None or data.empty:
+                        stored = store.read(symbol, interval)
+                        if stored is not None:
+                            store.write(symbol, interval, stored, meta['covered_start'], covered_end)
+                    else:
+                        store.merge(symbol, interval, data, meta['covered_start'], covered_end)
+                elif data is not None and not data.empty:
+                    meta = store.read_meta(symbol, interval)
+                    if meta is None:
+                        store.write(symbol, interval, data, start, requested_end)
+                    elif requested_end >= meta['covered_start']:
+                        store.merge(symbol, interval, data, start, max(requested_end, meta['covered_end']))
+                    else:
+                        # The new bars do not touch the stored range, so its coverage cannot be extended
+                        store.merge(symbol, interval, data, meta['covered_start'], meta['covered_end'])
+                # Serve the range from the store, so stored bars survive a fetch that returned nothing
+                stored = store.read(symbol, interval, start, end)
+                panel[symbol] = stored if stored is not None else pd.DataFrame()
+
+    return {symbol: panel[symbol] for symbol in dict.fromkeys(symbols)}
+
+def get_piotroski_score(ticker, fundamentals=None, rate_limiter=None):
     try:
-        stock = yf.Ticker(ticker)
+        fundamentals = fundamentals or get_fundamentals_cache()
 
         # Get fundamental financials
-        bs = stock.balance_sheet
-        is_ = stock.financials
-        cf = stock.cashflow
+        bs = fundamentals.get(ticker, 'balance_sheet', rate_limiter)
+        is_ = fundamentals.get(ticker, 'financials', rate_limiter)
+        cf = fundamentals.get(ticker, 'cashflow', rate_limiter)
 
         if bs.empty or is_.empty or cf.empty:
             print(f"{ticker}: Missing financial data")
@@ -77,10 +341,122 @@ def get_piotroski_score(ticker):
         return None
 
 
-def get_pead_score(ticker):
+# Statement rows used by the Piotroski F-score
+PIOTROSKI_ITEMS = {
+    'financials': ['Net Income', 'Gross Profit', 'Total Revenue'],
+    'balance_sheet': ['Total Assets', 'Long Term Debt', 'Total Current Assets',
+                      'Total Current Liabilities', 'Ordinary Shares Number'],
+    'cashflow': ['Operating Cash Flow'],
+}
+
+# Values get_piotroski_score assumes when a row is absent from the balance sheet
+PIOTROSKI_DEFAULTS = {
+    'Long Term Debt': 0,
+    'Total Current Assets': 0,
+    'Total Current Liabilities': 1,
+    'Ordinary Shares Number': 0,
+}
+
+
+def fundamentals_table(tickers, statements=tuple(PIOTROSKI_ITEMS), fundamentals=None):
+    """
+    Stack yf.Ticker statements for many tickers into one long table with
+    ticker, statement, item, period and value columns.
+    """
+    fundamentals = fundamentals or get_fundamentals_cache()
+    frames = []
+    for ticker in tickers:
+        for statement in statements:
+            try:
+                frame = fundamentals.get(ticker, statement)
+            except Exception as e:
+                print(f"{ticker}: could not load {statement}: {e}")
+                continue
+            if frame is None or frame.empty:
+                continue
+            rows, periods = frame.shape
+            frames.append(pd.DataFrame({
+                'ticker': ticker,
+                'statement': statement,
+                'item': np.repeat(frame.index.to_numpy(), periods),
+                'period': np.tile(frame.columns.to_numpy(), rows),
+                'value': frame.to_numpy(dtype=float).ravel(),
+            }))
+    if not frames:
+        return pd.DataFrame(columns=['ticker', 'statement', 'item', 'period', 'value'])
+    table = pd.concat(frames, ignore_index=True)
+    table['period'] = pd.to_datetime(table['period'])
+    return table
+
+
+def piotroski_scores(table):
+    """
+    Vectorized Piotroski F-score for every ticker in a fundamentals_table.
+    Compares the two most recent income-statement periods like get_piotroski_score,
+    but a missing row (e.g. 'Gross Profit') only zeroes the signals that need it
+    instead of dropping the ticker. Returns the nine 0/1 signals, the score and
+    the list of missing rows, indexed by ticker. Tickers lacking any of the three
+    statements or two income-statement periods are left out.
+    """
+    required = pd.MultiIndex.from_tuples([(statement, item) for statement, items in PIOTROSKI_ITEMS.items()
+                                          for item in items])
+    table = table[pd.MultiIndex.from_frame(table[['statement', 'item']]).isin(required)]
+
+    # Current and previous fiscal periods from the income statement, newest first
+    periods = (table.loc[table['statement'] == 'financials', ['ticker', 'period']].drop_duplicates()
+               .sort_values(['ticker', 'period'], ascending=[True, False]))
+    periods['n'] = periods.groupby('ticker').cumcount()
+    current = periods[periods['n'] == 0].set_index('ticker')['period']
+    previous = periods[periods['n'] == 1].set_index('ticker')['period']
+
+    has_statements = table.groupby('ticker')['statement'].nunique() == len(PIOTROSKI_ITEMS)
+    tickers = previous.index[has_statements.reindex(previous.index, fill_value=False).to_numpy()]
+
+    items = list(required.get_level_values(1))
+    values = (table.drop_duplicates(['ticker', 'item', 'period'])
+              .set_index(['ticker', 'period', 'item'])['value'].unstack('item')
+              .reindex(columns=items))
+    present = (pd.crosstab(table['ticker'], table['item']) > 0).reindex(index=tickers, columns=items,
+                                                                         fill_value=False)
+
+    def snapshot(period_of):
+        frame = values.reindex(pd.MultiIndex.from_arrays([tickers, period_of.reindex(tickers)]))
+        frame.index = tickers
+        frame = frame.astype(float)
+        for item, default in PIOTROSKI_DEFAULTS.items():
+            frame[item] = frame[item].where(present[item], default)
+        return frame
+
+    cur, prev = snapshot(current), snapshot(previous)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        signals = pd.DataFrame({
+            # Profitability
+            'net_income_positive': cur['Net Income'] > 0,
+            'cfo_positive': cur['Operating Cash Flow'] > 0,
+            'roa_positive': (cur['Total Assets'] > 0) & (cur['Net Income'] / cur['Total Assets'] > 0),
+            'cfo_exceeds_net_income': cur['Operating Cash Flow'] > cur['Net Income'],
+            # Leverage, Liquidity, Source of Funds
+            'lower_leverage': (prev['Long Term Debt'] > 0) & (cur['Long Term Debt'] < prev['Long Term Debt']),
+            'higher_current_ratio': (cur['Total Current Assets'] / cur['Total Current Liabilities'])
+                                    > (prev['Total Current Assets'] / prev['Total Current Liabilities']),
+            'no_dilution': cur['Ordinary Shares Number'] <= prev['Ordinary Shares Number'],
+            # Efficiency
+            'higher_gross_margin': (cur['Gross Profit'] / cur['Total Revenue'])
+                                   > (prev['Gross Profit'] / prev['Total Revenue']),
+            'higher_asset_turnover': (cur['Total Revenue'] / cur['Total Assets'])
+                                     > (prev['Total Revenue'] / prev['Total Assets']),
+        }, index=tickers).astype(int)
+
+    signals['score'] = signals.sum(axis=1)
+    signals['missing'] = [[item for item in items if not row[item]] for _, row in present.iterrows()]
+    return signals
+
+
+def get_pead_score(ticker, fundamentals=None):
     try:
-        stock = yf.Ticker(ticker)
-        earnings = stock.earnings_dates
+        fundamentals = fundamentals or get_fundamentals_cache()
+        earnings = fundamentals.get(ticker, 'earnings_dates')
 
         if earnings is None or earnings.empty:
             print(f"{ticker} has no recent earnings data.")
@@ -0,0 +1,253 @@
+import os
+import json
+import pandas as pd
+from datetime import datetime, time, timedelta
+
+# Default location of the on-disk store; override with the ALGOS_PRICE_STORE env variable
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'price_store')
+
+# NSE cash market session
+EXCHANGE_TZ = 'Asia/Kolkata'
+SESSION_CLOSE = time(15, 30)
+
+
+class PriceStore:
+    """
+    Persistent OHLCV store backed by Parquet files.
+    Bars are partitioned as <root>/<interval>/<symbol>.parquet, and a small
+    <symbol>.json sidecar records which date range has already been fetched
+    (and, for symbols a download returned nothing for, until when to stop retrying).
+    """
+
+    def __init__(self, root=None, max_age=timedelta(hours=12), empty_ttl=timedelta(hours=6)):
+        self.root = root or os.environ.get('ALGOS_PRICE_STORE', DEFAULT_STORE_DIR)
+        # How long the open-ended tail of a series is trusted before topping it up again
+        self.max_age = max_age
+        # How long a symbol that came back without bars is skipped by batch downloads
+        self.empty_ttl = empty_ttl
+
+    def _base_path(self, symbol, interval):
+        safe_symbol = symbol.replace('/', '_').replace(os.sep, '_')
+        return os.path.join(self.root, interval, safe_symbol)
+
+    def path(self, symbol, interval):
+        return self._base_path(symbol, interval) + '.parquet'
+
+    def read(self, symbol, interval, start=None, end=None):
+        """Load stored bars for a symbol, optionally sliced to [start, end). Returns None if not stored."""
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return None
+        data = pd.read_parquet(path)
+        return slice_range(data, start, end)
+
+    def _read_sidecar(self, symbol, interval):
+        meta_path = self._base_path(symbol, interval) + '.json'
+        if not os.path.exists(meta_path):
+            return {}
+        with open(meta_path, 'r') as f:
+            return json.load(f)
+
+    def read_meta(self, symbol, interval):
+        """Return the coverage metadata for a symbol, or None if nothing is stored."""
+        meta = self._read_sidecar(symbol, interval)
+        # A sidecar holding only a no-data marker has no coverage yet
+        if 'covered_end' not in meta:
+            return None
+        return {
+            'covered_start': pd.Timestamp(meta['covered_start']) if meta.get('covered_start') else None,
+            'covered_end': pd.Timestamp(meta['covered_end']),
+            'fetched_at': pd.Timestamp(meta['fetched_at']),
+        }
+
+    def write(self, symbol, interval, data, covered_start, covered_end, fetched_at=None):
+        """Replace the stored bars for a symbol and record the range they cover."""
+        base_path = self._base_path(symbol, interval)
+        os.makedirs(os.path.dirname(base_path), exist_ok=True)
+
+        data = data[~data.index.duplicated(keep='last')].sort_index()
+        # Write to a temp file first so an interrupted run never leaves a truncated partition
+        tmp_path = base_path + '.parquet.tmp'
+        data.to_parquet(tmp_path)
+        os.replace(tmp_path, base_path + '.parquet')
+
+        meta = {
+            'covered_start': _to_iso(covered_start),
+            'covered_end': _to_iso(covered_end),
+            'fetched_at': _to_iso(fetched_at or datetime.now()),
+        }
+        with open(base_path + '.json', 'w') as f:
+            json.dump(meta, f)
+
+    def mark_empty(self, symbol, interval, now=None):
+        """
+        Record that a download returned no bars for a symbol, so batch loads skip it
+        for `empty_ttl`. Stored bars and coverage are kept; the next write clears the marker.
+        """
+        base_path = self._base_path(symbol, interval)
+        os.makedirs(os.path.dirname(base_path), exist_ok=True)
+        meta = self._read_sidecar(symbol, interval)
+        meta['empty_until'] = _to_iso(pd.Timestamp(now or datetime.now()) + self.empty_ttl)
+        with open(base_path + '.json', 'w') as f:
+            json.dump(meta, f)
+
+    def is_marked_empty(self, symbol, interval, now=None):
+        """True while a no-data marker recorded by mark_empty has not expired."""
+        empty_until = self._read_sidecar(symbol, interval).get('empty_until')
+        return empty_until is not None and pd.Timestamp(now or datetime.now()) < pd.Timestamp(empty_until)
+
+    def merge(self, symbol, interval, new_data, covered_start, covered_end, fetched_at=None):
+        """Combine new bars with the stored ones (new bars win on overlap) and persist the result."""
+        stored = self.read(symbol, interval)
+        if stored is not None and not stored.empty:
+            new_data = pd.concat([stored, new_data])
+        self.write(symbol, interval, new_data, covered_start, covered_end, fetched_at)
+        return self.read(symbol, interval)
+
+    def is_fresh(self, meta, end):
+        """True when the stored range already covers `end`, or reaches to within max_age of now."""
+        if meta is None:
+            return False
+        if end is not None and pd.Timestamp(end) <= meta['covered_end']:
+            return True
+        return datetime.now() - meta['covered_end'].to_pydatetime() < self.max_age
+
+
+
+def trading_sessions(start, end, holidays=()):
+    """Expected NSE session dates in [start, end): weekdays minus the given exchange holidays."""
+    last = pd.Timestamp(end) - pd.Timedelta(days=1)
+    if last < pd.Timestamp(start):
+        return []
+    days = pd.bdate_range(pd.Timestamp(start).normalize(), last.normalize(), freq='C',
+                          holidays=[pd.Timestamp(h) for h in holidays])
+    return [day.date() for day in days]
+
+
+class IntradayStore:
+    """
+    Persistent store for intraday (1m/5m) bars, one Parquet file per trading session:
+    <root>/<interval>/<symbol>/<YYYY-MM-DD>.parquet. A per-symbol sessions.json index
+    lists the stored sessions and the ones known to have no bars (unlisted holidays),
+    so range reads only open the files of the requested sessions.
+    """
+
+    def __init__(self, root=None, holidays=()):
+        self.root = root or os.path.join(os.environ.get('ALGOS_PRICE_STORE', DEFAULT_STORE_DIR), 'intraday')
+        self.holidays = list(holidays)
+
+    def _symbol_dir(self, symbol, interval):
+        safe_symbol = symbol.replace('/', '_').replace(os.sep, '_')
+        return os.path.join(self.root, interval, safe_symbol)
+
+    def session_index(self, symbol, interval):
+        """Return {'stored': [...], 'closed': [...]} session dates for a symbol."""
+        index_path = os.path.join(self._symbol_dir(symbol, interval), 'sessions.json')
+        if not os.path.exists(index_path):
+            return {'stored': [], 'closed': []}
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+        return {key: [pd.Timestamp(day).date() for day in index.get(key, [])] for key in ('stored', 'closed')}
+
+    def _write_index(self, symbol, interval, index):
+        index_path = os.path.join(self._symbol_dir(symbol, interval), 'sessions.json')
+        with open(index_path, 'w') as f:
+            json.dump({key: sorted(day.isoformat() for day in set(days)) for key, days in index.items()}, f)
+
+    def missing_sessions(self, symbol, interval, start, end, now=None):
+        """Completed trading sessions in [start, end) that are neither stored nor known to be closed."""
+        now = exchange_time(now)
+        index = self.session_index(symbol, interval)
+        known = set(index['stored']) | set(index['closed'])
+        # Today's session only counts once the market has closed; until then it is always refetched
+        last_complete = now.date() if now.time() >= SESSION_CLOSE else now.date() - timedelta(days=1)
+        return [day for day in trading_sessions(start, end, self.holidays)
+                if day <= last_complete and day not in known]
+
+    def write_sessions(self, symbol, interval, data, requested=(), now=None):
+        """
+        Split bars into sessions and persist every completed one. Requested sessions
+        that fall inside the returned range but have no bars are recorded as closed.
+        """
+        symbol_dir = self._symbol_dir(symbol, interval)
+        os.makedirs(symbol_dir, exist_ok=True)
+        index = self.session_index(symbol, interval)
+        now = exchange_time(now)
+
+        if data is not None and not data.empty:
+            data = data[~data.index.duplicated(keep='last')].sort_index()
+            local_index = data.index.tz_localize(EXCHANGE_TZ) if data.index.tz is None \
+                else data.index.tz_convert(EXCHANGE_TZ)
+            session_dates = local_index.date
+            for day in sorted(set(session_dates)):
+                if day == now.date() and now.time() < SESSION_CLOSE:
+                    continue
+                tmp_path = os.path.join(symbol_dir, f"{day.isoformat()}.parquet.tmp")
+                data[session_dates == day].to_parquet(tmp_path)
+                os.replace(tmp_path, os.path.join(symbol_dir, f"{day.isoformat()}.parquet"))
+                index['stored'].append(day)
+
+            first, last = min(session_dates), max(session_dates)
+            index['closed'] += [day for day in requested
+                                if first <= day <= last and day not in set(session_dates)]
+
+        self._write_index(symbol, interval, index)
+
+    def read(self, symbol, interval, start=None, end=None):
+        """
+        Load the stored sessions in [start, end) as one frame with a 'Date' session column.
+        Returns an empty DataFrame when nothing in the range is stored.
+        """
+        stored = sorted(set(self.session_index(symbol, interval)['stored']))
+        if start is not None:
+            stored = [day for day in stored if day >= pd.Timestamp(start).date()]
+        if end is not None:
+            stored = [day for day in stored if day < pd.Timestamp(end).date()]
+        if not stored:
+            return pd.DataFrame()
+
+        symbol_dir = self._symbol_dir(symbol, interval)
+        frames = []
+        for day in stored:
+            session = pd.read_parquet(os.path.join(symbol_dir, f"{day.isoformat()}.parquet"))
+            session['Date'] = day
+            frames.append(session)
+        return pd.concat(frames)
+
+
+def slice_range(data, start=None, end=None):
+    """Slice a bar frame to [start, end), matching yfinance's exclusive end date."""
+    if data is None:
+        return None
+    index = data.index
+    if start is not None:
+        data = data[index >= _align_tz(start, index)]
+        index = data.index
+    if end is not None:
+        data = data[index < _align_tz(end, index)]
+    return data
+
+
+def _align_tz(ts, index):
+    ts = pd.Timestamp(ts)
+    tz = getattr(index, 'tz', None)
+    if tz is not None and ts.tzinfo is None:
+        return ts.tz_localize(tz)
+    if tz is None and ts.tzinfo is not None:
+        return ts.tz_localize(None)
+    return ts
+
+
+def exchange_time(ts=None):
+    """
+    Timestamp in the exchange timezone, defaulting to the current time.
+    Explicitly passed naive values are taken as local exchange time.
+    """
+    if ts is None:
+        return pd.Timestamp.now(tz=EXCHANGE_TZ)
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize(EXCHANGE_TZ) if ts.tzinfo is None else ts.tz_convert(EXCHANGE_TZ)
+
+
+def _to_iso(ts):
+    return pd.Timestamp(ts).isoformat() if ts is not None else None
@@ -0,0 +1,59 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+# Host key used for every yfinance request (query1/query2.finance.yahoo.com)
+YAHOO_HOST = 'finance.yahoo.com'
+
+# Requests per second allowed to each host by default
+DEFAULT_HOST_RATES = {
+    YAHOO_HOST: 4.0,
+    'www.screener.in': 1.0,
+    'www.moneycontrol.com': 1.0,
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilling `rate` tokens per second up to `capacity`."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available and take them."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """
+    One TokenBucket per host, shared by every thread making requests.
+    `rates` maps host -> requests per second; other hosts get `default_rate`.
+    """
+
+    def __init__(self, rates=None, default_rate=2.0, burst=1):
+        self.rates = dict(DEFAULT_HOST_RATES, **(rates or {}))
+        self.default_rate = default_rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url_or_host):
+        host = urlparse(url_or_host).netloc or url_or_host
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rates.get(host, self.default_rate), self.burst)
+            bucket = self.buckets[host]
+        bucket.acquire()
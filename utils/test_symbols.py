@@ -2,7 +2,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from utils.helper import download_data
+from utils.helper import download_batch
 from data.Index import nifty_next_500_symbols
 import pandas as pd
 
@@ -12,11 +12,12 @@ def test_symbols():
     failed_symbols = []
     
     print(f"Testing {len(nifty_next_500_symbols)} symbols...")
+    panel = download_batch(nifty_next_500_symbols, interval='1mo', period='1y')
     
     for i, symbol in enumerate(nifty_next_500_symbols, 1):
         try:
             print(f"Testing {i}/{len(nifty_next_500_symbols)}: {symbol}")
-            data = download_data(symbol, interval='1mo', period='1y')
+            data = panel.get(symbol)
             
             # Check if we got meaningful data
             if data is not None and len(data) > 0 and not data.empty: